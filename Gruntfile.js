@@ -34,10 +34,20 @@ Read more at https://git.new/primary/obsidian
 
 ────────────────────────────────────*/
 
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
 module.exports = function(grunt) {
+    const fullFonts = 'src/css/fonts/*.css';
+    const subsetFonts = 'src/css/fonts/subset/*.css';
+
     grunt.initConfig({
         pkg: grunt.file.readJSON('package.json'),
 
+        /*  Embedded fonts to bundle, set by the fonts task  */
+        fonts: fullFonts,
+
         /*  Get OBSIDIAN_PATH from .env file
 
             (Make sure to replace OBSIDIAN_PATH in
@@ -95,7 +105,7 @@ module.exports = function(grunt) {
                 files: {
                     'Primary.css': [
                         'src/css/readme.css',
-                        'src/css/fonts/*.css',
+                        '<%= fonts %>',
                         'src/css/main.min.css',
                         'src/css/style-settings.css'
                     ]
@@ -105,27 +115,39 @@ module.exports = function(grunt) {
                 files: {
                     'theme.css': [
                         'src/css/readme.css',
-                        'src/css/fonts/*.css',
+                        '<%= fonts %>',
+                        'src/css/main.min.css',
+                        'src/css/style-settings.css'
+                    ]
+                }
+            },
+            /*  Lean variant with the fonts split out: theme-lean.css
+                has no embedded fonts, theme-fonts.css can be added
+                as a CSS snippet by those who want Inter and Cascadia Code  */
+            lean: {
+                files: {
+                    'theme-lean.css': [
+                        'src/css/readme.css',
                         'src/css/main.min.css',
                         'src/css/style-settings.css'
+                    ],
+                    'theme-fonts.css': [
+                        '<%= fonts %>'
                     ]
                 }
             }
         },
 
-        /*  Copy minified concatenated of CSS (distributed form)
-            to your dev vault for live reload
+        /*  Sync minified concatenated of CSS (distributed form)
+            to your dev vaults for live reload
 
-            Rename function ensures that the copied file is not duplicated i.e. theme (1).css,
-            but instead replaces the file and forces the same name    */
-        copy: {
+            OBSIDIAN_PATH may list several theme folders separated
+            by ':' (';' on Windows). A vault is only written when its
+            copy differs, and through a temp file and a rename, so
+            Obsidian never reloads a half-written theme.css   */
+        sync: {
             hot_reload: {
-                expand: true,
-                src: 'theme.css',
-                dest: process.env.HOME + process.env.OBSIDIAN_PATH,
-                rename: function(dest, src) {
-                    return dest + 'theme.css';
-                }
+                src: 'theme.css'
             }
         },
 
@@ -134,7 +156,7 @@ module.exports = function(grunt) {
         watch: {
             css: {
                 files: ['src/**/*.scss', 'src/**/*.css'],
-                tasks: ['env', 'sass:unminified', 'sass:minified', 'cssmin', 'concat_css', 'copy', 'copy']
+                tasks: ['env', 'layers', 'cssmin', 'dedupe', 'fonts', 'concat_css:unminified', 'concat_css:dist', 'sync']
             }
         }
     });
@@ -144,7 +166,6 @@ module.exports = function(grunt) {
     grunt.loadNpmTasks('grunt-contrib-sass');
     grunt.loadNpmTasks('grunt-contrib-cssmin');
     grunt.loadNpmTasks('grunt-concat-css');
-    grunt.loadNpmTasks('grunt-contrib-copy');
     grunt.loadNpmTasks('grunt-contrib-watch');
 
     /*  loadenv command: accesses content of .env file
@@ -153,6 +174,185 @@ module.exports = function(grunt) {
         grunt.config('OBSIDIAN_PATH', process.env.OBSIDIAN_PATH);
     });
 
+    /*  sync command: copies a file into every vault in OBSIDIAN_PATH,
+        skipping vaults that already have identical content  */
+    function digest(content) {
+        return crypto.createHash('sha256').update(content).digest('hex');
+    }
+
+    grunt.registerMultiTask('sync', 'Copy theme.css to every dev vault, skipping unchanged copies', function() {
+        const vaults = (process.env.OBSIDIAN_PATH || '').split(path.delimiter)
+            .map(function(vault) { return vault.trim(); })
+            .filter(Boolean);
+        if (!vaults.length) {
+            grunt.log.warn('OBSIDIAN_PATH is not set, nothing to sync');
+            return;
+        }
+
+        const name = path.basename(this.data.src);
+        const content = fs.readFileSync(this.data.src);
+        const hash = digest(content);
+        vaults.forEach(function(vault) {
+            const dest = path.join(process.env.HOME + vault, name);
+            if (fs.existsSync(dest) && fs.statSync(dest).size === content.length &&
+                    digest(fs.readFileSync(dest)) === hash) {
+                grunt.log.writeln('Unchanged ' + dest);
+                return;
+            }
+            grunt.file.mkdir(path.dirname(dest));
+            const tmp = path.join(path.dirname(dest), '.' + name + '.' + process.pid + '.tmp');
+            fs.writeFileSync(tmp, content);
+            fs.renameSync(tmp, dest);
+            grunt.log.ok('Synced ' + dest);
+        });
+    });
+
+    /*  layers command: incremental replacement for sass:unminified
+        and sass:minified
+
+        Compiles each layer of index.scss (10_foundations ...
+        60_community-plugins) on its own and caches the CSS in
+        .build-cache/ under a hash of the layer's sources. Only layers
+        whose files changed are recompiled; main.css, main.min.css and
+        their source maps are then spliced from the cached chunks.
+        The layers don't share Sass variables or mixins, so the result
+        is the same stylesheet a full compile produces   */
+    const layerCache = '.build-cache';
+    const styles = {
+        unminified: { style: 'expanded', file: 'src/css/main.css', separator: '\n\n' },
+        minified: { style: 'compressed', file: 'src/css/main.min.css', separator: '' }
+    };
+
+    function indexLayers() {
+        const layers = {};
+        const uses = grunt.file.read('src/scss/index.scss').match(/^@use\s+'[^']+';/gm) || [];
+        uses.forEach(function(line) {
+            const layer = line.match(/'([^'\/]+)/)[1];
+            (layers[layer] = layers[layer] || []).push(line);
+        });
+        return layers;
+    }
+
+    function layerHash(sass, layer, uses, style) {
+        const hash = crypto.createHash('sha256');
+        hash.update([sass.info, style].concat(uses).join('\n'));
+        grunt.file.expand({ cwd: 'src/scss/' + layer }, '**/*.scss').sort().forEach(function(file) {
+            hash.update(file + '\0' + grunt.file.read('src/scss/' + layer + '/' + file) + '\0');
+        });
+        return hash.digest('hex').slice(0, 16);
+    }
+
+    function compileLayer(sass, uses, style) {
+        const result = sass.compileString(uses.join('\n'), {
+            loadPaths: ['src/scss'],
+            style: style,
+            sourceMap: true
+        });
+        /*  Chunks are spliced into one file, which gets a
+            single @charset or byte-order mark up front  */
+        const css = result.css.replace(/^(\uFEFF|@charset "UTF-8";\n)/, '');
+        result.sourceMap.sources = result.sourceMap.sources.map(function(url) {
+            if (!url.startsWith('file://')) {
+                return url;
+            }
+            return path.relative('src/css', decodeURI(url.slice('file://'.length))).split(path.sep).join('/');
+        });
+        return { css: css, map: result.sourceMap, charset: css !== result.css };
+    }
+
+    grunt.registerTask('layers', 'Compile index.scss layer by layer, reusing cached layers', function() {
+        const sass = require('sass');
+        const layers = indexLayers();
+        let compiled = 0;
+
+        Object.keys(styles).forEach(function(target) {
+            const options = styles[target];
+            const chunks = Object.keys(layers).map(function(layer) {
+                const file = layerCache + '/' + layer + '.' + options.style + '.' +
+                    layerHash(sass, layer, layers[layer], options.style) + '.json';
+                if (grunt.file.exists(file)) {
+                    return grunt.file.readJSON(file);
+                }
+                grunt.file.expand(layerCache + '/' + layer + '.' + options.style + '.*.json').forEach(function(stale) {
+                    grunt.file.delete(stale);
+                });
+                const chunk = compileLayer(sass, layers[layer], options.style);
+                grunt.file.write(file, JSON.stringify(chunk));
+                compiled++;
+                return chunk;
+            });
+
+            /*  Splice the chunks and index their maps by line offset  */
+            let css = chunks.some(function(chunk) { return chunk.charset; })
+                ? (options.style === 'compressed' ? '\uFEFF' : '@charset "UTF-8";\n')
+                : '';
+            const sections = [];
+            chunks.forEach(function(chunk, i) {
+                if (i > 0 && chunk.css) {
+                    css += options.separator;
+                }
+                const lines = css.split('\n');
+                sections.push({
+                    offset: { line: lines.length - 1, column: lines[lines.length - 1].length },
+                    map: chunk.map
+                });
+                css += chunk.css;
+            });
+            const mapFile = path.basename(options.file) + '.map';
+            grunt.file.write(options.file, css + '\n\n/*# sourceMappingURL=' + mapFile + ' */\n');
+            grunt.file.write(options.file + '.map', JSON.stringify({
+                version: 3,
+                file: path.basename(options.file),
+                sections: sections
+            }));
+        });
+
+        grunt.log.ok(compiled + ' of ' + Object.keys(layers).length * Object.keys(styles).length +
+            ' layer chunk(s) recompiled');
+    });
+
+    /*  dedupe command: runs scripts/optimize-css.py on main.min.css,
+        dropping repeated declarations and folding identical rules
+        without reordering the cascade. The script only writes when it
+        has verified the result; without Python the build goes on with
+        cssmin's output. Set PYTHON to use another interpreter   */
+    grunt.registerTask('dedupe', 'Deduplicate declarations in main.min.css', function() {
+        const done = this.async();
+        grunt.util.spawn({
+            cmd: process.env.PYTHON || (process.platform === 'win32' ? 'python' : 'python3'),
+            args: ['scripts/optimize-css.py', 'src/css/main.min.css']
+        }, function(error, result) {
+            if (error) {
+                grunt.log.warn('optimize-css.py did not run, main.min.css left as is: ' +
+                    (result.stderr || result.stdout || error.message).trim().split('\n').pop());
+            } else {
+                grunt.log.ok(result.stdout.trim().split('\n').pop().trim());
+            }
+            done();
+        });
+    });
+
+    /*  fonts command: picks the embedded fonts concat_css bundles.
+        The full fonts unless grunt runs with --subset-fonts, then
+        the subset written by scripts/subset-fonts.py, which lacks
+        the scripts it was not asked to keep. Checked on every run,
+        so a running watch notices the subset appearing or going   */
+    grunt.registerTask('fonts', 'Choose the full or subset embedded fonts', function() {
+        if (!grunt.option('subset-fonts')) {
+            grunt.config('fonts', fullFonts);
+            return;
+        }
+        if (!grunt.file.expand(subsetFonts).length) {
+            grunt.fail.warn('--subset-fonts: no subset fonts yet, run scripts/subset-fonts.py first');
+            return;
+        }
+        grunt.config('fonts', subsetFonts);
+        grunt.log.ok('Bundling the subset fonts');
+    });
+
+    /*  lean command: builds theme-lean.css and theme-fonts.css  */
+    grunt.registerTask('lean', ['sass:minified', 'cssmin', 'dedupe', 'fonts', 'concat_css:lean']);
+
     /*  default command: watches for changes in the working directory
         and performs tasks as indicated under the grunt-contrib-watch plugin    */
     grunt.registerTask('default', ['env:vault', 'loadenv', 'watch']);
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Benchmark palette generation as the palette library and template grow.
+
+Synthesizes palettes from the template's own primitives (hues rotated
+with a fixed seed) and larger templates by repeating each section's
+declarations under renamed variables, then times every stage of
+generate-palettes.py per configuration:
+
+    template   parse _classic-original.scss into its structural index
+    load       parse and validate the palette definitions
+    render     substitute each palette into the template
+    write      write each _<slug>.scss atomically (to a temp directory)
+    snippets   render each palette as a CSS snippet
+    bundle     render every palette into one _bundle.scss
+    total      template + load + render + write, as one serial run
+
+Timings keep the median and the best of --repeat runs; peak memory per
+stage comes from a separate tracemalloc pass so it does not skew them.
+Results are written as JSON and compared with a baseline on the best
+run, which is the least noisy, failing when a stage got slower by more
+than --tolerance. Everything runs offline; --build also times the
+Grunt build chain when node_modules is installed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from palette_api import gen
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+RESULTS_DIR = os.path.join(ROOT, '.benchmarks')
+LATEST = os.path.join(RESULTS_DIR, 'latest.json')
+BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+THEME_CSS = os.path.join(ROOT, 'theme.css')
+RESULTS_FORMAT = 1
+
+DEFAULT_COUNTS = [1, 10, 100, 1000]
+DEFAULT_SCALES = [1, 2, 4, 8]
+SCALE_PALETTES = 10     # palettes rendered when sweeping template size
+
+# Slowdowns smaller than this are timer noise, whatever the ratio
+NOISE_FLOOR_MS = 1.0
+
+BUILD_TASKS = ['layers', 'cssmin', 'dedupe', 'fonts', 'concat_css:unminified', 'concat_css:dist']
+
+
+# ─────────────────────────────────────────────
+# SYNTHETIC INPUTS
+# ─────────────────────────────────────────────
+
+HUE = re.compile(r'(hsla\(\s*)(\d+(?:\.\d+)?)')
+
+
+def synthesize_palettes(template, count: int, seed: int) -> dict:
+    """`count` valid palettes: the template's defaults with every hue rotated."""
+    rng = random.Random(seed)
+    defaults = template.defaults()
+    palettes = {}
+    for i in range(count):
+        shift = rng.randrange(360)
+        palette = {'name': f'Benchmark {i + 1}', 'light': {}, 'dark': {}}
+        for mode in ('light', 'dark'):
+            for key, value in defaults[mode].items():
+                if key.startswith('accent-h-'):
+                    value = str((int(value) + shift) % 360)
+                else:
+                    value = HUE.sub(lambda m: f'{m.group(1)}{(float(m.group(2)) + shift) % 360:g}', value)
+                palette[mode][key] = value
+        palettes[f'benchmark-{i + 1:04d}'] = palette
+    return palettes
+
+
+def scale_template(template, factor: int) -> str:
+    """
+    The template with each section's body repeated `factor` times; the
+    copies declare and read renamed variables (`--x` → `--x-copy2`), so
+    substitutions still land once while declarations grow linearly.
+    """
+    content = template.content
+    edits = []
+    for start, end, path in template.blocks:
+        if len(path) != 1 or path[0] not in gen.SECTION_BLOCKS:
+            continue
+        body = content[start + 1:end - 1]
+        copies = ''.join(
+            re.sub(r'--([\w-]+)', rf'--\1-copy{n}', body)
+            for n in range(2, factor + 1)
+        )
+        edits.append((end - 1, copies))
+    pieces = []
+    pos = 0
+    for at, text in sorted(edits):
+        pieces.append(content[pos:at])
+        pieces.append(text)
+        pos = at
+    pieces.append(content[pos:])
+    return ''.join(pieces)
+
+
+# ─────────────────────────────────────────────
+# STAGES
+# Each stage takes the state built by the ones before it.
+# ─────────────────────────────────────────────
+
+def stage_template(state):
+    state['template'] = gen.PaletteTemplate(state['content'])
+
+
+def stage_load(state):
+    state['palettes'] = {}
+    for slug, data in state['definitions'].items():
+        palette = gen.parse_palette(f'{slug}.json', data)
+        errors = gen.validate_palette(palette)
+        if errors:
+            raise gen.PaletteError(f'{slug}: {errors[0]}')
+        state['palettes'][slug] = palette
+
+
+def stage_render(state):
+    template = state['template']
+    state['rendered'] = {slug: template.render(palette) for slug, palette in state['palettes'].items()}
+
+
+def stage_write(state):
+    for slug, content in state['rendered'].items():
+        gen.write_atomic(os.path.join(state['out_dir'], f'_{slug}.scss'), content)
+
+
+def stage_snippets(state):
+    state['snippets'] = {slug: gen.render_css(palette) for slug, palette in state['palettes'].items()}
+
+
+def stage_bundle(state):
+    state['bundle'] = gen.render_bundle(state['palettes'])
+
+
+def stage_total(state):
+    for stage in (stage_template, stage_load, stage_render, stage_write):
+        stage(state)
+
+
+STAGES = {
+    'template': stage_template,
+    'load': stage_load,
+    'render': stage_render,
+    'write': stage_write,
+    'snippets': stage_snippets,
+    'bundle': stage_bundle,
+    'total': stage_total,
+}
+
+
+def run_config(content: str, count: int, seed: int, repeat: int) -> dict:
+    """Time and measure every stage for one (palette count, template) pair."""
+    template = gen.PaletteTemplate(content)
+    palettes = synthesize_palettes(template, count, seed)
+    definitions = {slug: json.dumps(palette).encode() for slug, palette in palettes.items()}
+
+    with tempfile.TemporaryDirectory(prefix='palette-bench-') as out_dir:
+        state = {'content': content, 'definitions': definitions, 'out_dir': out_dir}
+        timings = {name: [] for name in STAGES}
+        for _ in range(repeat):
+            for name, stage in STAGES.items():
+                start = time.perf_counter()
+                stage(state)
+                timings[name].append((time.perf_counter() - start) * 1000)
+
+        peaks = {}
+        tracemalloc.start()
+        for name, stage in STAGES.items():
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            stage(state)
+            peaks[name] = round((tracemalloc.get_traced_memory()[1] - base) / 1024, 1)
+        tracemalloc.stop()
+
+        written = [os.path.getsize(os.path.join(out_dir, f'_{slug}.scss')) for slug in palettes]
+
+    return {
+        'palettes': count,
+        'template_bytes': len(content.encode()),
+        'declarations': sum(len(spans) for spans in state['template'].declarations.values()),
+        'stages': {
+            name: {
+                'median_ms': round(statistics.median(times), 3),
+                'min_ms': round(min(times), 3),
+                'peak_kb': peaks[name],
+            }
+            for name, times in timings.items()
+        },
+        'sizes': {
+            'scss_total_bytes': sum(written),
+            'scss_mean_bytes': round(sum(written) / len(written)),
+            'snippets_total_bytes': sum(len(css.encode()) for css in state['snippets'].values()),
+            'bundle_bytes': len(state['bundle'].encode()),
+        },
+    }
+
+
+def run_build() -> dict:
+    """Time one pass of the Grunt build chain, if it is installed."""
+    grunt = os.path.join(ROOT, 'node_modules', '.bin', 'grunt')
+    if not os.path.exists(grunt) or not shutil.which('node'):
+        return {'skipped': 'node_modules not installed (npm install)'}
+    start = time.perf_counter()
+    result = subprocess.run([grunt, *BUILD_TASKS], cwd=ROOT, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        return {'skipped': f'grunt exited with {result.returncode}'}
+    return {'tasks': BUILD_TASKS, 'ms': round(elapsed, 1), 'theme_css_bytes': os.path.getsize(THEME_CSS)}
+
+
+# ─────────────────────────────────────────────
+# RESULTS
+# ─────────────────────────────────────────────
+
+def config_id(run: dict) -> str:
+    return f"{run['palettes']}p×{run['scale']}"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Stages whose best run got slower than the baseline's by more than `tolerance`."""
+    previous = {config_id(run): run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in results['runs']:
+        before = previous.get(config_id(run))
+        if not before:
+            continue
+        for name, stage in run['stages'].items():
+            old = before['stages'].get(name, {}).get('min_ms')
+            new = stage['min_ms']
+            if old and new > old * (1 + tolerance) and new - old > NOISE_FLOOR_MS:
+                regressions.append({'config': config_id(run), 'stage': name,
+                                    'baseline_ms': old, 'min_ms': new, 'ratio': round(new / old, 2)})
+    return regressions
+
+
+def write_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    gen.write_atomic(path, json.dumps(data, indent=2) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark palette generation against palette count and template size.')
+    parser.add_argument('--palettes', nargs='+', type=int, default=DEFAULT_COUNTS, metavar='N',
+                        help=f"palette counts to sweep on the stock template (default: {' '.join(map(str, DEFAULT_COUNTS))})")
+    parser.add_argument('--scales', nargs='+', type=int, default=DEFAULT_SCALES, metavar='K',
+                        help=f'template sizes to sweep with {SCALE_PALETTES} palettes, as multiples of the stock template '
+                             f"(default: {' '.join(map(str, DEFAULT_SCALES))})")
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per configuration (default: 5)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the synthesized palettes (default: 0)')
+    parser.add_argument('--build', action='store_true', help='also time the Grunt build chain once')
+    parser.add_argument('-o', '--output', default=LATEST, metavar='PATH',
+                        help='where to write the results (default: .benchmarks/latest.json)')
+    parser.add_argument('--baseline', default=BASELINE, metavar='PATH',
+                        help='results to compare against, if present (default: .benchmarks/baseline.json)')
+    parser.add_argument('--save-baseline', action='store_true', help='also store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='fail when a stage is this much slower than the baseline (default: 0.25 = 25%%)')
+    args = parser.parse_args()
+
+    with open(gen.ORIGINAL, 'r', encoding='utf-8') as f:
+        stock = gen.PaletteTemplate(f.read())
+    configs = [(count, 1) for count in args.palettes]
+    configs += [(SCALE_PALETTES, scale) for scale in args.scales if (SCALE_PALETTES, scale) not in configs]
+
+    print("⏱️  Primary Theme Palette Benchmark")
+    print("=" * 40)
+    print(f"\n   {len(configs)} configuration(s), median of {args.repeat} run(s)")
+    print(f"\n   {'config':>10}  {'decls':>6}  {'template':>9}  {'load':>8}  {'render':>8}  {'write':>8}  "
+          f"{'snippets':>8}  {'bundle':>8}  {'total':>9}  {'peak':>8}")
+
+    runs = []
+    for count, scale in configs:
+        run = {'scale': scale, **run_config(scale_template(stock, scale), count, args.seed, args.repeat)}
+        runs.append(run)
+        stages = run['stages']
+        cells = '  '.join(f"{stages[name]['median_ms']:>{9 if name in ('template', 'total') else 8}.1f}"
+                          for name in ('template', 'load', 'render', 'write', 'snippets', 'bundle', 'total'))
+        print(f"   {config_id(run):>10}  {run['declarations']:>6}  {cells}  "
+              f"{stages['total']['peak_kb'] / 1024:>6.1f}MB")
+    print("   (milliseconds; peak is Python heap during the total stage)")
+
+    results = {
+        'format': RESULTS_FORMAT,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'theme_css_bytes': os.path.getsize(THEME_CSS) if os.path.exists(THEME_CSS) else None,
+        'runs': runs,
+    }
+    if args.build:
+        results['build'] = run_build()
+        build = results['build']
+        if 'skipped' in build:
+            print(f"\n⚠️  Build chain skipped: {build['skipped']}")
+        else:
+            print(f"\n🏗️  Build chain: {build['ms'] / 1000:.1f} s, theme.css {build['theme_css_bytes'] / 1024:.0f} KB")
+    results['peak_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        results['baseline'] = {'path': os.path.relpath(args.baseline), 'created': baseline.get('created'),
+                               'tolerance': args.tolerance, 'regressions': regressions}
+        mark = '❌' if regressions else '✅'
+        print(f"\n{mark} {len(regressions)} regression(s) against the baseline from {baseline.get('created')}")
+        for entry in regressions:
+            print(f"   {entry['config']:>10} {entry['stage']:<9} {entry['baseline_ms']:.1f} → "
+                  f"{entry['min_ms']:.1f} ms (×{entry['ratio']})")
+
+    write_json(args.output, results)
+    print(f"\n📄 Results written to {os.path.relpath(args.output)}")
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"📌 Saved as the baseline: {os.path.relpath(args.baseline)}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
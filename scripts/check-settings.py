@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Cross-check the Style Settings schema against the compiled theme.
+
+Parses src/css/style-settings.css (see style_settings.py) and looks
+up every setting in src/css/main.css:
+
+-   class-toggle ids and class-select options that no selector
+    mentions, so switching them does nothing
+-   variable-* settings whose variable no var() in the theme reads
+-   ids shared by settings that store a value
+-   body classes that gate rules in main.css but that neither a
+    setting nor Obsidian ever adds, so those rules can never match
+
+Build first (npx grunt) so main.css reflects the current sources.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from css_rules import CLASS, compounds, iter_rules
+from css_vars import MAIN_CSS, theme_graph
+from style_settings import SettingsError, load_schema, setting_classes
+
+# Body classes Obsidian and the Style Settings plugin add themselves
+OBSIDIAN_BODY_CLASSES = {
+    'theme-light', 'theme-dark', 'is-mobile', 'is-phone', 'is-tablet', 'is-ios', 'is-android',
+    'is-focused', 'is-frameless', 'is-hidden-frameless', 'is-fullscreen', 'is-translucent',
+    'is-popout-window', 'is-grabbing', 'is-hidden-nav', 'mod-windows', 'mod-macos', 'mod-linux',
+    'mod-rtl', 'native-scrollbars', 'styled-scrollbars', 'show-inline-title', 'show-ribbon',
+    'show-view-header', 'auto-full-screen', 'css-settings-manager',
+}
+
+NOT = re.compile(r':not\((?:[^()]|\([^()]*\))*\)')
+
+
+def body_classes(selector: str) -> set:
+    """Classes a selector requires on body (in a `body…` or `.theme-*` compound)."""
+    found = set()
+    for compound in compounds(selector):
+        if compound.startswith('body') or '.theme-light' in compound or '.theme-dark' in compound:
+            found.update(CLASS.findall(NOT.sub('', compound)))
+    return found
+
+
+def cross_reference(schema, rules: list, graph) -> dict:
+    selector_classes = set()
+    for rule in rules:
+        for selector in rule.selectors:
+            selector_classes.update(CLASS.findall(selector))
+
+    dead_classes = []
+    for setting in schema.by_type.get('class-toggle', []) + schema.by_type.get('class-select', []):
+        default = setting.fields.get('default')
+        for name in setting_classes(setting):
+            if name != default and name not in selector_classes:
+                dead_classes.append({'setting': setting.id, 'type': setting.type, 'class': name, 'line': setting.line})
+
+    read = graph.read()
+    unread = []
+    for name, settings in schema.variables.items():
+        if name not in read:
+            unread.append({'setting': settings[0].id, 'type': settings[0].type, 'variable': name,
+                           'line': settings[0].line, 'certain': graph.checked(name)})
+
+    reachable = set(schema.classes) | OBSIDIAN_BODY_CLASSES
+    gated = {}
+    for rule in rules:
+        blocked = [body_classes(selector) - reachable for selector in rule.selectors]
+        if all(blocked):
+            for name in set().union(*blocked):
+                entry = gated.setdefault(name, {'rules': 0, 'bytes': 0, 'lines': []})
+                entry['rules'] += 1
+                entry['bytes'] += rule.end - rule.start
+                entry['lines'].append(rule.line)
+
+    return {
+        'settings': len(schema.settings),
+        'types': {kind: len(settings) for kind, settings in schema.by_type.items()},
+        'duplicates': {setting_id: [s.line for s in settings] for setting_id, settings in schema.duplicates().items()},
+        'dead_classes': dead_classes,
+        'unread_variables': unread,
+        'unreachable_classes': gated,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check the Style Settings schema against the compiled theme.')
+    parser.add_argument('--reader', action='append', default=[], metavar='CSS',
+                        help="stylesheet outside the theme whose var() reads count, such as Obsidian's app.css")
+    parser.add_argument('--report', metavar='PATH',
+                        help="write the report as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args()
+
+    try:
+        schema = load_schema()
+    except SettingsError as e:
+        print(f"❌ style-settings.css: {e}", file=sys.stderr)
+        sys.exit(1)
+    with open(MAIN_CSS, 'r', encoding='utf-8') as f:
+        rules = list(iter_rules(f.read()))
+    report = cross_reference(schema, rules, theme_graph(args.reader))
+    problems = len(report['dead_classes']) + len(report['unreachable_classes'])
+    problems += sum(1 for entry in report['unread_variables'] if entry['certain'])
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        sys.exit(1 if problems else 0)
+
+    print("🎛️  Primary Theme Style Settings Check")
+    print("=" * 40)
+    counts = ', '.join(f'{n} {kind}' for kind, n in sorted(report['types'].items(), key=lambda item: -item[1]))
+    print(f"\n   {report['settings']} settings: {counts}")
+    print(f"   {len(rules)} rules in main.css")
+
+    mark = '❌' if report['dead_classes'] else '✅'
+    print(f"\n{mark} {len(report['dead_classes'])} class setting(s) that no selector matches")
+    for entry in report['dead_classes']:
+        print(f"   line {entry['line']}: {entry['setting']} ({entry['type']}) → .{entry['class']}")
+
+    certain = [entry for entry in report['unread_variables'] if entry['certain']]
+    mark = '❌' if certain else '✅'
+    print(f"\n{mark} {len(certain)} variable setting(s) that nothing reads")
+    for entry in certain:
+        print(f"   line {entry['line']}: {entry['setting']} → --{entry['variable']}")
+    unsure = len(report['unread_variables']) - len(certain)
+    if unsure:
+        print(f"   ({unsure} more set variables the theme never reads but Obsidian may;"
+              " pass --reader app.css to decide)")
+
+    mark = '❌' if report['unreachable_classes'] else '✅'
+    print(f"\n{mark} {len(report['unreachable_classes'])} body class(es) gating rules that nothing can enable")
+    for name, entry in sorted(report['unreachable_classes'].items()):
+        print(f"   .{name}: {entry['rules']} rule(s), {entry['bytes'] / 1024:.1f} KB, "
+              f"main.css line {', '.join(map(str, entry['lines'][:5]))}{' …' if len(entry['lines']) > 5 else ''}")
+
+    if report['duplicates']:
+        print(f"\n⚠️  {len(report['duplicates'])} id(s) shared by several settings")
+        for setting_id, lines in report['duplicates'].items():
+            print(f"   {setting_id}: lines {', '.join(map(str, lines))}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\n📄 Report written to {args.report}")
+
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
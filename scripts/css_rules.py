@@ -0,0 +1,113 @@
+"""
+Rule-level view of a compiled stylesheet such as src/css/main.css.
+
+A small tokenizer, not a full CSS parser: it understands comments,
+strings, nested at-rule blocks and comma-separated selector lists,
+which is everything Sass emits.
+"""
+
+import re
+from bisect import bisect_right
+from collections import namedtuple
+
+TOKEN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]', re.S)
+COMMENT = re.compile(r'/\*.*?\*/', re.S)
+CLASS = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+
+# At-rules whose blocks hold no style rules
+SKIPPED_AT_RULES = ('@keyframes', '@-webkit-keyframes', '@font-face', '@page')
+
+# `selectors` is the rule's selector list, `context` the at-rule
+# preludes it is nested in (outermost first), `start`/`end` the
+# offsets of the whole rule and `body` the text between its braces.
+Rule = namedtuple('Rule', 'selectors context body start end line')
+
+
+def split_top_level(text: str, separator: str = ',') -> list:
+    """Split on `separator` outside parentheses, brackets and strings."""
+    parts = []
+    depth = 0
+    start = 0
+    quote = None
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote and text[i - 1] != '\\':
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def declarations(body: str) -> list:
+    """The `property: value` declarations of a rule body, in order."""
+    return split_top_level(COMMENT.sub('', body), ';')
+
+
+def declaration_property(declaration: str) -> str:
+    return declaration.split(':', 1)[0].strip().lower()
+
+
+def split_complex(selector: str) -> list:
+    """
+    A complex selector as (combinator, compound) pairs. The combinator
+    joins a compound to the one before it: ' ' (descendant), '>', '+'
+    or '~'; it is '' for the first compound.
+    """
+    parts = []
+    depth = 0
+    combinator = ''
+    current = ''
+    for char in selector:
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        if depth == 0 and (char.isspace() or char in '>+~'):
+            if current:
+                parts.append((combinator, current))
+                current = ''
+                combinator = ' '
+            if char in '>+~':
+                combinator = char
+        else:
+            current += char
+    if current:
+        parts.append((combinator, current))
+    return parts
+
+
+def compounds(selector: str) -> list:
+    """A complex selector's compound selectors, split at its combinators."""
+    return [compound for _, compound in split_complex(selector)]
+
+
+def iter_rules(css: str):
+    """Yield every style rule, skipping @font-face, @keyframes and friends."""
+    lines = [0] + [m.end() for m in re.finditer('\n', css)]
+    stack = []
+    prelude_start = 0
+    for token in TOKEN.finditer(css):
+        text = token.group()
+        if text == '{':
+            prelude = ' '.join(COMMENT.sub('', css[prelude_start:token.start()]).split())
+            stack.append((prelude, prelude_start, token.end()))
+            prelude_start = token.end()
+        elif text == '}':
+            if stack:
+                prelude, start, body_start = stack.pop()
+                context = tuple(p for p, _, _ in stack)
+                if not prelude.startswith('@') and not any(p.startswith(SKIPPED_AT_RULES) for p in context):
+                    start = body_start - 1 - len(css[start:body_start - 1].lstrip())
+                    yield Rule(split_top_level(prelude), context, css[body_start:token.start()],
+                               start, token.end(), bisect_right(lines, start))
+            prelude_start = token.end()
+        elif text == ';' or (text.startswith('/*') and not css[prelude_start:token.start()].strip()):
+            prelude_start = token.end()
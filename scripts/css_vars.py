@@ -0,0 +1,185 @@
+"""
+Define/use graph of the theme's CSS custom properties.
+
+Every `--name: value;` declaration in the Sass sources, the compiled
+main.css and the Style Settings schema is a definition; every
+`var(--name)` is a use. A use inside a custom property's value is an
+edge from that property, any other use (a `color:`, `background:`…
+declaration) is a root. A variable is live when a root reaches it
+through the edges; the rest is never read by the theme.
+
+Obsidian and community plugins read many variables themselves, which
+this graph cannot see. Unless their stylesheets are passed as extra
+readers, only the theme's own primitives (PRIVATE_PREFIXES) are
+reported as dead; every other definition counts as read from outside.
+"""
+
+import glob
+import os
+import re
+from bisect import bisect_right
+from collections import namedtuple
+
+from style_settings import STYLE_SETTINGS, load_schema
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+SCSS_DIR = os.path.join(ROOT, 'src', 'scss')
+MAIN_CSS = os.path.join(ROOT, 'src', 'css', 'main.css')
+
+# Variables only this theme defines and reads
+PRIVATE_PREFIXES = ('color-l-', 'color-d-')
+
+# Set on body by Obsidian from the user's accent color
+RUNTIME_VARIABLES = {'accent-h', 'accent-s', 'accent-l'}
+
+CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+SCSS_COMMENT = re.compile(r'/\*.*?\*/|(?<![:\w])//[^\n]*', re.S)
+DEFINITION = re.compile(r'(?<![\w-])--([\w-]+)\s*:(?!:)\s*([^;{}]*)')
+USE = re.compile(r'var\(\s*--([\w-]+)')
+
+Definition = namedtuple('Definition', 'file line uses')
+Use = namedtuple('Use', 'file line')
+
+
+def blank_comments(text: str, scss: bool = False) -> str:
+    """Replace comments with spaces, keeping offsets and line numbers intact."""
+    pattern = SCSS_COMMENT if scss else CSS_COMMENT
+    return pattern.sub(lambda m: re.sub(r'[^\n]', ' ', m.group()), text)
+
+
+def theme_sources() -> list:
+    """The files the theme's variables are defined and read in."""
+    scss = sorted(glob.glob(os.path.join(SCSS_DIR, '**', '*.scss'), recursive=True))
+    return scss + [MAIN_CSS]
+
+
+class VarGraph:
+    """
+    Custom property definitions and uses, indexed by name.
+
+    `definitions[name]` lists where a variable is declared and which
+    variables each declaration reads; `roots[name]` lists the uses
+    outside any custom property; `settings[name]` is the Style
+    Settings type of a variable the user can set.
+    """
+
+    def __init__(self):
+        self.definitions = {}
+        self.roots = {}
+        self.settings = {}
+        self.readers = []
+        self.external = set()
+        self.provided = set()
+
+    def add_css(self, path: str, text: str = None):
+        """Index one CSS or SCSS file."""
+        if text is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        text = blank_comments(text, scss=path.endswith('.scss'))
+        rel = os.path.relpath(path, ROOT)
+
+        lines = [0] + [m.end() for m in re.finditer('\n', text)]
+
+        def line_of(offset):
+            return bisect_right(lines, offset)
+
+        values = []
+        for match in DEFINITION.finditer(text):
+            uses = tuple(USE.findall(match.group(2)))
+            definition = Definition(rel, line_of(match.start()), uses)
+            self.definitions.setdefault(match.group(1), []).append(definition)
+            values.append(match.span(2))
+
+        v = 0
+        for match in USE.finditer(text):
+            while v < len(values) and values[v][1] <= match.start():
+                v += 1
+            if v < len(values) and values[v][0] <= match.start():
+                continue
+            self.roots.setdefault(match.group(1), []).append(Use(rel, line_of(match.start())))
+
+    def add_settings(self, path: str = STYLE_SETTINGS):
+        """Index the variables the Style Settings schema lets users set."""
+        for name, settings in load_schema(path).variables.items():
+            self.settings[name] = settings[0].type
+
+    def add_reader(self, path: str):
+        """
+        Count every var() in a stylesheet outside the theme (such as
+        Obsidian's app.css) as a read. Once any reader is added, all
+        variables are checked, not only the private ones.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            text = blank_comments(f.read())
+        self.readers.append(path)
+        self.external.update(USE.findall(text))
+        self.provided.update(name for name, _ in DEFINITION.findall(text))
+
+    def checked(self, name: str) -> bool:
+        """Whether a variable's liveness is decided by this graph alone."""
+        return bool(self.readers) or name.startswith(PRIVATE_PREFIXES)
+
+    def live(self) -> set:
+        """Every variable reachable from a root."""
+        stack = list(self.roots)
+        stack += self.external
+        stack += [name for name in self.definitions if not self.checked(name)]
+        seen = set()
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for definition in self.definitions.get(name, ()):
+                stack.extend(definition.uses)
+        return seen
+
+    def dead(self) -> list:
+        """Defined variables nothing reads, sorted by name."""
+        live = self.live()
+        return sorted(name for name in self.definitions if name not in live)
+
+    def read(self) -> set:
+        """Every variable some var() names, inside a custom property or not."""
+        names = set(self.roots) | self.external
+        for definitions in self.definitions.values():
+            for definition in definitions:
+                names.update(definition.uses)
+        return names
+
+    def undefined(self) -> list:
+        """Variables read but defined nowhere: not by the theme, Style Settings or a reader."""
+        return sorted(name for name in self.read()
+                      if name not in self.definitions and name not in self.settings
+                      and name not in self.provided and self.checked(name))
+
+
+def tunable_variables(graph: VarGraph, overridable=()) -> set:
+    """
+    Variables whose value on body can change at runtime: the ones Style
+    Settings or Obsidian set, any a partial redeclares (class-toggle
+    settings and body classes switch those declarations on, including
+    the palette classes of _bundle.scss), and the `overridable` ones a
+    CSS snippet may set over the theme.
+    """
+    palettes = os.path.join('src', 'scss', '10_foundations', 'palettes')
+    bundle = os.path.join(palettes, '_bundle.scss')
+    main = os.path.relpath(MAIN_CSS, ROOT)
+    tunable = set(graph.settings) | RUNTIME_VARIABLES | set(overridable)
+    for name, definitions in graph.definitions.items():
+        if any(d.file == bundle or not d.file.startswith(palettes) and d.file != main for d in definitions):
+            tunable.add(name)
+    return tunable
+
+
+def theme_graph(readers=()) -> VarGraph:
+    """Build the graph over the Sass sources, main.css and style-settings.css."""
+    graph = VarGraph()
+    for path in theme_sources():
+        if os.path.exists(path):
+            graph.add_css(path)
+    graph.add_settings()
+    for path in readers:
+        graph.add_reader(path)
+    return graph
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Find CSS custom properties the theme declares but never reads.
+
+Builds the define/use graph of every `--variable` across src/scss/,
+src/css/main.css and src/css/style-settings.css (see css_vars.py)
+and lists the declarations no `var()` can reach. Each of them is
+inherited-property work on every style recalculation and bytes in
+theme.css for nothing.
+
+Obsidian reads most of the theme's variables itself, so by default
+only the theme's own color primitives (--color-l-*, --color-d-*) are
+checked. Pass Obsidian's app.css (and any plugin stylesheets) with
+--reader to check every variable.
+
+Generated palette files can be written without the dead primitives
+with: python3 scripts/generate-palettes.py --prune
+"""
+
+import argparse
+import json
+import sys
+
+from css_vars import theme_graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find CSS custom properties the theme never reads.")
+    parser.add_argument('--reader', action='append', default=[], metavar='CSS',
+                        help="stylesheet outside the theme whose var() reads count, such as Obsidian's app.css "
+                             "(repeatable; checks every variable instead of only the primitives)")
+    parser.add_argument('--report', metavar='PATH',
+                        help="write the report as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args()
+
+    graph = theme_graph(args.reader)
+    dead = graph.dead()
+    undefined = graph.undefined()
+    report = {
+        'scope': 'all' if args.reader else 'primitives',
+        'readers': args.reader,
+        'defined': len(graph.definitions),
+        'read': len(graph.live() & set(graph.definitions)),
+        'dead': {
+            name: {
+                'declarations': [f'{d.file}:{d.line}' for d in graph.definitions[name]],
+                'setting': graph.settings.get(name),
+            }
+            for name in dead
+        },
+        'undefined': {name: [f'{u.file}:{u.line}' for u in graph.roots.get(name, ())] for name in undefined},
+    }
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print("🔎 Primary Theme Unused Variables")
+        print("=" * 40)
+        scope = 'every variable' if args.reader else 'color primitives only (pass --reader app.css to check all)'
+        print(f"\n   Checked:  {scope}")
+        print(f"   Defined:  {report['defined']} variable(s), {report['read']} read")
+
+        mark = '⚠️ ' if dead else '✅'
+        print(f"\n{mark} {len(dead)} declared variable(s) never read")
+        for name, entry in report['dead'].items():
+            setting = f" (Style Settings {entry['setting']})" if entry['setting'] else ''
+            print(f"   --{name}{setting}: {len(entry['declarations'])} declaration(s), first at {entry['declarations'][0]}")
+
+        if undefined:
+            print(f"\n❌ {len(undefined)} variable(s) read but never declared")
+            for name, uses in report['undefined'].items():
+                print(f"   --{name}: {', '.join(uses[:3])}{' …' if len(uses) > 3 else ''}")
+
+        if dead:
+            print("\nDrop them from the generated palettes with:")
+            print("  python3 scripts/generate-palettes.py --prune")
+
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+            print(f"\n📄 Report written to {args.report}")
+
+    sys.exit(1 if undefined else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,525 +1,1494 @@
 #!/usr/bin/env python3
 """
-Generate 4 color palette variants for Primary Obsidian Theme.
+Generate color palette variants for Primary Obsidian Theme.
 Each palette replaces ONLY the color primitive HSL/RGB values,
 keeping all variable names, structure, and non-color code identical.
+Palettes are defined by the files in scripts/palettes/.
 """
 
+import argparse
+import hashlib
+import json
+import glob
+import marshal
 import re
 import os
-import shutil
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import groupby
+from operator import attrgetter
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    try:
+        import tomli as tomllib
+    except ModuleNotFoundError:
+        tomllib = None
 
 PALETTES_DIR = os.path.join(os.path.dirname(__file__), '..', 'src', 'scss', '10_foundations', 'palettes')
 ORIGINAL = os.path.join(PALETTES_DIR, '_classic-original.scss')
 
 # ─────────────────────────────────────────────
 # PALETTE DEFINITIONS
-# Each palette defines replacements for color primitives only
-# Format: { 'search_pattern': 'replacement_value' }
+# One file per palette in scripts/palettes/, named <slug>.toml
+# (or <slug>.json): a `name` plus [light] and [dark] tables of
+# color primitive replacements, keyed as in SUBSTITUTIONS below.
+# Files are only read when their slug is selected; validated
+# palettes are cached in .cache/ keyed by the file's hash.
+# ─────────────────────────────────────────────
+
+PALETTE_DATA_DIR = os.path.join(os.path.dirname(__file__), 'palettes')
+PALETTE_CACHE_DIR = os.path.join(PALETTE_DATA_DIR, '.cache')
+PALETTE_EXTENSIONS = ('.toml', '.json')
+# Bump whenever validate_palette() tightens: cached entries skip it
+PALETTE_CACHE_FORMAT = b'2'
+# Slugs become file names, CSS class names and Style Settings values
+PALETTE_SLUG = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+# Names go into CSS comments and YAML: one line, nothing that closes either
+PALETTE_NAME = re.compile(r'(?:(?!\*/|/\*)[^\x00-\x1f\x7f{};\\])+')
+PALETTE_NAME_LENGTH = 64
+
+
+class PaletteError(Exception):
+    """A palette definition is missing or does not match the schema."""
+
+
+def palette_files() -> dict:
+    """{slug: path} of every palette definition, without reading them."""
+    files = {}
+    for filename in sorted(os.listdir(PALETTE_DATA_DIR)):
+        slug, ext = os.path.splitext(filename)
+        if ext in PALETTE_EXTENSIONS:
+            if not PALETTE_SLUG.fullmatch(slug):
+                raise PaletteError(f'{filename}: palette file names must be lowercase letters, digits and hyphens')
+            if slug in files:
+                raise PaletteError(f'{slug}: defined by both {os.path.basename(files[slug])} and {filename}')
+            files[slug] = os.path.join(PALETTE_DATA_DIR, filename)
+    return files
+
+
+def parse_palette(path: str, data: bytes) -> dict:
+    if path.endswith('.json'):
+        return json.loads(data)
+    if tomllib is None:
+        raise PaletteError(f'{path}: reading TOML palettes needs Python 3.11+ or the tomli package')
+    return tomllib.loads(data.decode('utf-8'))
+
+
+def validate_palette(palette: dict) -> list:
+    """Return a list of schema errors; empty when the palette is valid."""
+    if not isinstance(palette, dict):
+        return [f'expected a table of name, light and dark, got {type(palette).__name__}']
+    errors = []
+    name = palette.get('name')
+    if not isinstance(name, str) or not name.strip():
+        errors.append("'name' must be a non-empty string")
+    elif len(name) > PALETTE_NAME_LENGTH or not PALETTE_NAME.fullmatch(name):
+        errors.append(f"'name' = {name[:PALETTE_NAME_LENGTH]!r} must be one line of at most "
+                      f"{PALETTE_NAME_LENGTH} characters, without braces, semicolons, backslashes or comment markers")
+    for key in palette:
+        if key not in ('name', 'light', 'dark'):
+            errors.append(f'unknown top-level key {key!r}')
+    for mode, subs in SUBSTITUTIONS.items():
+        values = palette.get(mode)
+        if not isinstance(values, dict):
+            errors.append(f'[{mode}] table is missing')
+            continue
+        known = {sub.key: sub for sub in subs}
+        for key, value in values.items():
+            sub = known.get(key)
+            if sub is None:
+                errors.append(f'[{mode}] unknown key {key!r}')
+            elif not isinstance(value, str) or not VALUE_PATTERNS[sub.kind].fullmatch(value):
+                errors.append(f'[{mode}] {key} = {value!r} is not a valid {sub.kind} value')
+    return errors
+
+
+def load_palette(path: str) -> dict:
+    """Load and validate one palette file, going through the compiled cache."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    slug = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(PALETTE_CACHE_FORMAT + data).hexdigest()[:16]
+    cached = os.path.join(PALETTE_CACHE_DIR, f'{slug}.{digest}.marshal')
+
+    try:
+        with open(cached, 'rb') as f:
+            return marshal.load(f)
+    except (FileNotFoundError, EOFError, ValueError, TypeError):
+        pass
+
+    try:
+        palette = parse_palette(path, data)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise PaletteError(f'{path}: {e}') from e
+    errors = validate_palette(palette)
+    if errors:
+        raise PaletteError(f'{path}:\n  ' + '\n  '.join(errors))
+
+    # Other threads or processes may be caching the same palette:
+    # write through a temp file of our own and tolerate lost races
+    os.makedirs(PALETTE_CACHE_DIR, exist_ok=True)
+    for stale in glob.glob(os.path.join(PALETTE_CACHE_DIR, f'{slug}.*.marshal')):
+        if stale != cached:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+    fd, tmp = tempfile.mkstemp(prefix=f'{slug}.', suffix='.tmp', dir=PALETTE_CACHE_DIR)
+    with os.fdopen(fd, 'wb') as f:
+        marshal.dump(palette, f)
+    os.replace(tmp, cached)
+    return palette
+
+
+def load_palettes(only=None) -> dict:
+    """Load the selected palettes (all when `only` is empty), in slug order."""
+    files = palette_files()
+    slugs = list(only) if only else list(files)
+    unknown = [slug for slug in slugs if slug not in files]
+    if unknown:
+        raise PaletteError(f"unknown palette(s): {', '.join(unknown)} (available: {', '.join(files)})")
+    return {slug: load_palette(files[slug]) for slug in slugs}
+
+
+TEMPLATE_NAME = 'Classic Original'
+TEMPLATE_SLUG = 'classic-original'
+HEADER_NAME = f'in {TEMPLATE_NAME}'
+
+# ─────────────────────────────────────────────
+# SUBSTITUTIONS
+# Every palette key maps to one template variable.
+# section: 'light' / 'dark', or None for the whole file
+# kind:    which part of the declared value is replaced
+# first:   replace only the first declaration in the section
+# ─────────────────────────────────────────────
+
+GRAY_STEPS = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110, 120, 130, 140]
+SEMANTIC_COLORS = ['red', 'orange', 'yellow', 'green', 'blue', 'purple']
+SEMANTIC_SHADES = [10, 20, 30, 40]
+SPECIAL_COLORS = ['gray', 'red', 'orange', 'yellow', 'green', 'cyan', 'blue', 'purple', 'pink']
+
+Substitution = namedtuple('Substitution', 'group key section var kind first')
+
+# Values are pasted into CSS verbatim, so each kind only admits
+# numbers in its own shape: nothing that could end a declaration
+NUMBER = r'\d+(?:\.\d+)?'
+ALPHA = r'(?:\d*\.)?\d+%?'
+HSLA = rf'hsla\(\s*{NUMBER}\s*,\s*{NUMBER}%\s*,\s*{NUMBER}%\s*,\s*{ALPHA}\s*\)'
+VALUE_PATTERNS = {
+    'hsla': re.compile(HSLA),
+    'number': re.compile(r'\d+'),
+    'percent': re.compile(r'\d+%'),
+    # color-*-rgb triples and the color-* colors built from them
+    'value': re.compile(
+        rf'rgba?\(\s*{NUMBER}\s*,\s*{NUMBER}\s*,\s*{NUMBER}\s*(?:,\s*{ALPHA}\s*)?\)'
+        rf'|hsla?\(\s*{NUMBER}\s*,\s*{NUMBER}%\s*,\s*{NUMBER}%\s*(?:,\s*{ALPHA}\s*)?\)'
+        rf'|#(?:[0-9a-fA-F]{{3,4}}|[0-9a-fA-F]{{6}}|[0-9a-fA-F]{{8}})'
+        rf'|{NUMBER}\s*,\s*{NUMBER}\s*,\s*{NUMBER}'
+    ),
+}
+
+
+def palette_substitutions(mode: str) -> list:
+    """List the substitutions a palette's light or dark dict can drive."""
+    m = mode[0]
+    subs = []
+    for n in GRAY_STEPS:
+        key = f'color-{m}-gray-{n}'
+        subs.append(Substitution('grayscale', key, None, key, 'hsla', False))
+    key = f'color-{m}-alpha-gray'
+    subs.append(Substitution('grayscale', key, None, key, 'hsla', False))
+    for color in SEMANTIC_COLORS:
+        for shade in SEMANTIC_SHADES:
+            key = f'color-{m}-{color}-{shade}'
+            subs.append(Substitution('semantic', key, None, key, 'hsla', False))
+        key = f'color-{m}-alpha-{color}'
+        subs.append(Substitution('semantic', key, None, key, 'hsla', False))
+    for part, kind in [('h', 'number'), ('s', 'percent'), ('l', 'percent')]:
+        subs.append(Substitution('accent', f'accent-{part}-{mode}', mode, f'accent-{part}', kind, False))
+    for color in SPECIAL_COLORS:
+        subs.append(Substitution('special', f'color-{color}-rgb-{mode}', mode, f'color-{color}-rgb', 'value', True))
+        subs.append(Substitution('special', f'color-{color}-{mode}', mode, f'color-{color}', 'value', True))
+    return subs
+
+
+SUBSTITUTIONS = {mode: palette_substitutions(mode) for mode in ('light', 'dark')}
+
+# ─────────────────────────────────────────────
+# TEMPLATE INDEX
 # ─────────────────────────────────────────────
 
-PALETTES = {
-    # ───── Blossom Neo ─────
-    # Neobrutalist kawaii: pink/teal/amber with flat colored shadows
-    # Fonts: Poppins + Fira Code
-    'blossom-neo': {
-        'name': 'Blossom Neo',
-        'light': {
-            # Grayscale: warm pink-tinted (hue ~330-340)
-            # bg rgb(246,230,238)=hsl(330,47%,93%), fg rgb(91,91,91)=hsl(0,0%,36%)
-            'color-l-gray-10':  'hsla(330, 40%, 97%, 1)',
-            'color-l-gray-20':  'hsla(330, 38%, 95%, 1)',
-            'color-l-gray-30':  'hsla(330, 30%, 92%, 1)',
-            'color-l-gray-40':  'hsla(330, 24%, 89%, 1)',
-            'color-l-gray-50':  'hsla(330, 18%, 86%, 1)',
-            'color-l-gray-60':  'hsla(330, 14%, 80%, 1)',
-            'color-l-gray-70':  'hsla(330, 8%, 68%, 1)',
-            'color-l-gray-80':  'hsla(330, 5%, 56%, 1)',
-            'color-l-gray-90':  'hsla(330, 3%, 46%, 1)',
-            'color-l-gray-100': 'hsla(330, 3%, 38%, 1)',
-            'color-l-gray-110': 'hsla(330, 3%, 34%, 1)',
-            'color-l-gray-120': 'hsla(330, 4%, 28%, 1)',
-            'color-l-gray-130': 'hsla(330, 5%, 22%, 1)',
-            'color-l-gray-140': 'hsla(330, 6%, 16%, 1)',
-            'color-l-alpha-gray': 'hsla(330, 8%, 68%, 0.15)',
-            # Red → Coral (destructive: rgb(249,111,112))
-            'color-l-red-10':  'hsla(0, 88%, 76%, 1)',
-            'color-l-red-20':  'hsla(0, 92%, 71%, 1)',
-            'color-l-red-30':  'hsla(356, 72%, 58%, 1)',
-            'color-l-red-40':  'hsla(352, 65%, 45%, 1)',
-            'color-l-alpha-red': 'hsla(0, 85%, 70%, 0.2)',
-            # Orange → Warm Amber (accent: rgb(251,226,167))
-            'color-l-orange-10': 'hsla(30, 80%, 68%, 1)',
-            'color-l-orange-20': 'hsla(28, 85%, 60%, 1)',
-            'color-l-orange-30': 'hsla(25, 78%, 52%, 1)',
-            'color-l-orange-40': 'hsla(22, 82%, 40%, 1)',
-            'color-l-alpha-orange': 'hsla(28, 90%, 60%, 0.2)',
-            # Yellow → Cream/Gold (card: rgb(253,237,201))
-            'color-l-yellow-10': 'hsla(42, 88%, 82%, 1)',
-            'color-l-yellow-20': 'hsla(40, 85%, 72%, 1)',
-            'color-l-yellow-30': 'hsla(38, 78%, 58%, 1)',
-            'color-l-yellow-40': 'hsla(36, 82%, 44%, 1)',
-            'color-l-alpha-yellow': 'hsla(42, 93%, 82%, 0.25)',
-            # Green → Teal (secondary: rgb(138,207,209))
-            'color-l-green-10': 'hsla(182, 42%, 72%, 1)',
-            'color-l-green-20': 'hsla(182, 48%, 62%, 1)',
-            'color-l-green-30': 'hsla(182, 45%, 50%, 1)',
-            'color-l-green-40': 'hsla(182, 52%, 38%, 1)',
-            'color-l-alpha-green': 'hsla(182, 40%, 68%, 0.2)',
-            # Blue → Muted Teal-Blue (muted: rgb(178,225,235))
-            'color-l-blue-10':  'hsla(191, 48%, 78%, 1)',
-            'color-l-blue-20':  'hsla(191, 52%, 65%, 1)',
-            'color-l-blue-30':  'hsla(191, 48%, 50%, 1)',
-            'color-l-blue-40':  'hsla(191, 55%, 36%, 1)',
-            'color-l-alpha-blue': 'hsla(191, 50%, 65%, 0.2)',
-            # Purple → Hot Pink/Magenta (primary: rgb(208,79,153))
-            'color-l-purple-10': 'hsla(326, 52%, 72%, 1)',
-            'color-l-purple-20': 'hsla(326, 55%, 62%, 1)',
-            'color-l-purple-30': 'hsla(326, 55%, 52%, 1)',
-            'color-l-purple-40': 'hsla(326, 58%, 40%, 1)',
-            'color-l-alpha-purple': 'hsla(326, 55%, 56%, 0.2)',
-            # Accent
-            'accent-h-light': '326',
-            'accent-s-light': '55%',
-            'accent-l-light': '56%',
-            # Special colors
-            'color-gray-rgb-light':   '195, 185, 190',
-            'color-gray-light':       'hsla(330, 8%, 75%, 1)',
-            'color-red-rgb-light':    '249, 111, 112',
-            'color-red-light':        'hsla(0, 92%, 71%, 1)',
-            'color-orange-rgb-light': '240, 170, 100',
-            'color-orange-light':     'hsla(30, 82%, 60%, 1)',
-            'color-yellow-rgb-light': '251, 226, 167',
-            'color-yellow-light':     'hsla(42, 93%, 82%, 1)',
-            'color-green-rgb-light':  '138, 207, 209',
-            'color-green-light':      'hsla(182, 42%, 68%, 1)',
-            'color-cyan-rgb-light':   '132, 210, 226',
-            'color-cyan-light':       'hsla(191, 55%, 70%, 1)',
-            'color-blue-rgb-light':   '120, 185, 210',
-            'color-blue-light':       'hsla(197, 50%, 65%, 1)',
-            'color-purple-rgb-light': '208, 79, 153',
-            'color-purple-light':     'hsla(326, 55%, 56%, 1)',
-            'color-pink-rgb-light':   '243, 160, 202',
-            'color-pink-light':       'hsla(330, 78%, 79%, 1)',
-        },
-        'dark': {
-            # Grayscale: deep teal-navy (bg: rgb(18,36,46)=hsl(201,44%,13%))
-            'color-d-gray-10':  'hsla(334, 35%, 92%, 1)',
-            'color-d-gray-20':  'hsla(334, 28%, 80%, 1)',
-            'color-d-gray-30':  'hsla(346, 20%, 70%, 1)',
-            'color-d-gray-40':  'hsla(346, 14%, 55%, 1)',
-            'color-d-gray-50':  'hsla(200, 12%, 42%, 1)',
-            'color-d-gray-60':  'hsla(201, 18%, 30%, 1)',
-            'color-d-gray-70':  'hsla(201, 24%, 24%, 1)',
-            'color-d-gray-80':  'hsla(201, 30%, 18%, 1)',
-            'color-d-gray-90':  'hsla(201, 36%, 15%, 1)',
-            'color-d-gray-100': 'hsla(201, 40%, 13%, 1)',
-            'color-d-gray-110': 'hsla(201, 42%, 12%, 1)',
-            'color-d-gray-120': 'hsla(201, 44%, 11%, 1)',
-            'color-d-gray-130': 'hsla(201, 46%, 9%, 1)',
-            'color-d-gray-140': 'hsla(201, 48%, 7%, 1)',
-            'color-d-alpha-gray': 'hsla(200, 12%, 42%, 0.2)',
-            # Red → Pink-Rose (destructive: rgb(227,94,164))
-            'color-d-red-10':  'hsla(328, 75%, 75%, 1)',
-            'color-d-red-20':  'hsla(328, 70%, 68%, 1)',
-            'color-d-red-30':  'hsla(328, 65%, 60%, 1)',
-            'color-d-red-40':  'hsla(328, 58%, 50%, 1)',
-            'color-d-alpha-red': 'hsla(328, 70%, 65%, 0.2)',
-            # Orange → Warm Amber
-            'color-d-orange-10': 'hsla(30, 78%, 62%, 1)',
-            'color-d-orange-20': 'hsla(28, 75%, 54%, 1)',
-            'color-d-orange-30': 'hsla(25, 70%, 48%, 1)',
-            'color-d-orange-40': 'hsla(22, 68%, 40%, 1)',
-            'color-d-alpha-orange': 'hsla(28, 78%, 55%, 0.2)',
-            # Yellow → Warm Gold (primary in dark: rgb(251,226,167))
-            'color-d-yellow-10': 'hsla(42, 90%, 82%, 1)',
-            'color-d-yellow-20': 'hsla(40, 85%, 72%, 1)',
-            'color-d-yellow-30': 'hsla(38, 78%, 62%, 1)',
-            'color-d-yellow-40': 'hsla(36, 72%, 52%, 1)',
-            'color-d-alpha-yellow': 'hsla(42, 93%, 82%, 0.2)',
-            # Green → Teal (ring: rgb(80,175,182))
-            'color-d-green-10': 'hsla(184, 48%, 58%, 1)',
-            'color-d-green-20': 'hsla(184, 45%, 48%, 1)',
-            'color-d-green-30': 'hsla(184, 50%, 38%, 1)',
-            'color-d-green-40': 'hsla(184, 55%, 30%, 1)',
-            'color-d-alpha-green': 'hsla(184, 45%, 48%, 0.2)',
-            # Blue → Deep Teal
-            'color-d-blue-10':  'hsla(191, 50%, 58%, 1)',
-            'color-d-blue-20':  'hsla(191, 48%, 48%, 1)',
-            'color-d-blue-30':  'hsla(191, 52%, 38%, 1)',
-            'color-d-blue-40':  'hsla(191, 55%, 30%, 1)',
-            'color-d-alpha-blue': 'hsla(191, 50%, 48%, 0.2)',
-            # Purple → Soft Rose (secondary: rgb(228,162,177))
-            'color-d-purple-10': 'hsla(346, 52%, 78%, 1)',
-            'color-d-purple-20': 'hsla(346, 48%, 68%, 1)',
-            'color-d-purple-30': 'hsla(346, 42%, 58%, 1)',
-            'color-d-purple-40': 'hsla(346, 38%, 48%, 1)',
-            'color-d-alpha-purple': 'hsla(346, 50%, 68%, 0.2)',
-            # Accent (inverted: amber in dark)
-            'accent-h-dark': '42',
-            'accent-s-dark': '85%',
-            'accent-l-dark': '72%',
-            # Special colors (dark)
-            'color-gray-rgb-dark':   '160, 145, 152',
-            'color-gray-dark':       'rgb(160, 145, 152)',
-            'color-red-rgb-dark':    '227, 94, 164',
-            'color-red-dark':        'rgb(200, 90, 145)',
-            'color-orange-rgb-dark': '225, 155, 95',
-            'color-orange-dark':     'rgb(200, 140, 80)',
-            'color-yellow-rgb-dark': '251, 226, 167',
-            'color-yellow-dark':     'rgb(235, 210, 155)',
-            'color-green-rgb-dark':  '80, 175, 182',
-            'color-green-dark':      'rgb(70, 165, 172)',
-            'color-cyan-rgb-dark':   '100, 185, 195',
-            'color-cyan-dark':       'rgb(85, 175, 185)',
-            'color-blue-rgb-dark':   '90, 160, 185',
-            'color-blue-dark':       'rgb(75, 148, 172)',
-            'color-purple-rgb-dark': '228, 162, 177',
-            'color-purple-dark':     'rgb(210, 148, 165)',
-            'color-pink-rgb-dark':   '249, 168, 212',
-            'color-pink-dark':       'rgb(230, 155, 195)',
+DECLARATION = re.compile(r'--([\w-]+):\s*([^;]+)(?=;)')
+ALIAS = re.compile(r'var\(--([\w-]+)\)')
+ACCENT_PART = re.compile(r'var\(--accent-([hsl])\)')
+CALC = re.compile(r'calc\(\s*(-?[\d.]+)(%?)\s*([-+*/])\s*(-?[\d.]+)\s*\)')
+VAR = re.compile(r'var\(\s*--([\w-]+)\s*(?:,(?:[^()]|\([^()]*\))*)?\)')
+
+
+def _calc(match) -> str:
+    a, unit, op, b = match.groups()
+    a, b = float(a), float(b)
+    result = {'+': a + b, '-': a - b, '*': a * b, '/': a / b}[op]
+    return f'{result:g}{unit}'
+
+
+# Top-level selector blocks that scope each section of the template
+SECTION_BLOCKS = {'body': 'body', '.theme-light': 'light', '.theme-dark': 'dark'}
+TOKEN = re.compile(r'/\*.*?\*/|//[^\n]*|[{};]', re.S)
+
+
+class PaletteTemplate:
+    """
+    The palette template parsed once into a structural index: its
+    selector blocks, and the value spans of its `--var: value;`
+    declarations keyed by (section, variable name). Sections are the
+    top-level `body`, `.theme-light` and `.theme-dark` blocks.
+    Rendering a palette is a single join over the slices between
+    the spans it replaces.
+    """
+
+    def __init__(self, content: str):
+        self.content = content
+        self._index_blocks()
+
+        self.declarations = {}
+        self.locations = {}
+        for match in DECLARATION.finditer(content):
+            if self._in_comment(match.start()):
+                continue
+            path = self.path_at(match.start())
+            section = SECTION_BLOCKS.get(path[0], path[0]) if path else None
+            name = match.group(1)
+            self.declarations.setdefault((section, name), []).append(match.span(2))
+            self.locations.setdefault(name, []).append((match.span(2), section, path))
+
+        self.header_spans = [m.span() for m in re.finditer(re.escape(HEADER_NAME), content)]
+        self.matches = {}
+        self.spans = {}
+        for subs in SUBSTITUTIONS.values():
+            for sub in subs:
+                found = self.find_spans(sub)
+                self.matches[sub.key] = found
+                self.spans[sub.key] = found[:1] if sub.first else found
+        self.primitive_keys = {
+            mode: {sub.var: sub.key for sub in subs}
+            for mode, subs in SUBSTITUTIONS.items()
         }
-    },
-    # ───── A: Slate Ocean ─────
-    'slate-ocean': {
-        'name': 'Slate Ocean',
-        'light': {
-            # Grayscale: cool slate-blue base (hue ~210-215)
-            'color-l-gray-10':  'hsla(210, 30%, 98%, 1)',
-            'color-l-gray-20':  'hsla(212, 28%, 96%, 1)',
-            'color-l-gray-30':  'hsla(213, 25%, 92%, 1)',
-            'color-l-gray-40':  'hsla(214, 22%, 89%, 1)',
-            'color-l-gray-50':  'hsla(214, 20%, 86%, 1)',
-            'color-l-gray-60':  'hsla(215, 18%, 79%, 1)',
-            'color-l-gray-70':  'hsla(215, 15%, 65%, 1)',
-            'color-l-gray-80':  'hsla(216, 13%, 55%, 1)',
-            'color-l-gray-90':  'hsla(217, 14%, 45%, 1)',
-            'color-l-gray-100': 'hsla(218, 18%, 36%, 1)',
-            'color-l-gray-110': 'hsla(219, 20%, 32%, 1)',
-            'color-l-gray-120': 'hsla(220, 22%, 26%, 1)',
-            'color-l-gray-130': 'hsla(222, 30%, 20%, 1)',
-            'color-l-gray-140': 'hsla(224, 40%, 14%, 1)',
-            'color-l-alpha-gray': 'hsla(215, 15%, 65%, 0.15)',
-            # Red → Rose
-            'color-l-red-10':  'hsla(347, 55%, 62%, 1)',
-            'color-l-red-20':  'hsla(347, 68%, 52%, 1)',
-            'color-l-red-30':  'hsla(347, 62%, 44%, 1)',
-            'color-l-red-40':  'hsla(347, 72%, 32%, 1)',
-            'color-l-alpha-red': 'hsla(347, 80%, 60%, 0.18)',
-            # Orange → Warm Amber
-            'color-l-orange-10': 'hsla(28, 65%, 60%, 1)',
-            'color-l-orange-20': 'hsla(25, 75%, 54%, 1)',
-            'color-l-orange-30': 'hsla(22, 70%, 46%, 1)',
-            'color-l-orange-40': 'hsla(20, 85%, 34%, 1)',
-            'color-l-alpha-orange': 'hsla(25, 90%, 50%, 0.18)',
-            # Yellow → Amber
-            'color-l-yellow-10': 'hsla(38, 68%, 64%, 1)',
-            'color-l-yellow-20': 'hsla(36, 80%, 52%, 1)',
-            'color-l-yellow-30': 'hsla(34, 78%, 44%, 1)',
-            'color-l-yellow-40': 'hsla(32, 90%, 34%, 1)',
-            'color-l-alpha-yellow': 'hsla(36, 90%, 50%, 0.18)',
-            # Green → Emerald
-            'color-l-green-10': 'hsla(160, 35%, 60%, 1)',
-            'color-l-green-20': 'hsla(162, 50%, 44%, 1)',
-            'color-l-green-30': 'hsla(164, 55%, 36%, 1)',
-            'color-l-green-40': 'hsla(166, 65%, 26%, 1)',
-            'color-l-alpha-green': 'hsla(162, 60%, 42%, 0.18)',
-            # Blue → Cyan/Teal
-            'color-l-blue-10':  'hsla(192, 45%, 54%, 1)',
-            'color-l-blue-20':  'hsla(195, 62%, 44%, 1)',
-            'color-l-blue-30':  'hsla(198, 60%, 35%, 1)',
-            'color-l-blue-40':  'hsla(200, 80%, 24%, 1)',
-            'color-l-alpha-blue': 'hsla(195, 60%, 44%, 0.18)',
-            # Purple → Indigo/Lavender
-            'color-l-purple-10': 'hsla(250, 45%, 72%, 1)',
-            'color-l-purple-20': 'hsla(248, 40%, 58%, 1)',
-            'color-l-purple-30': 'hsla(246, 42%, 44%, 1)',
-            'color-l-purple-40': 'hsla(244, 55%, 32%, 1)',
-            'color-l-alpha-purple': 'hsla(248, 70%, 62%, 0.18)',
-            # Accent
-            'accent-h-light': '215',
-            'accent-s-light': '20%',
-            'accent-l-light': '45%',
-            # Special colors
-            'color-gray-rgb-light':   '165, 172, 182',
-            'color-gray-light':       'hsla(215, 10%, 68%, 1)',
-            'color-red-rgb-light':    '210, 80, 95',
-            'color-red-light':        'hsla(347, 55%, 50%, 1)',
-            'color-orange-rgb-light': '220, 130, 65',
-            'color-orange-light':     'hsla(25, 65%, 50%, 1)',
-            'color-yellow-rgb-light': '230, 185, 55',
-            'color-yellow-light':     'hsla(36, 82%, 44%, 1)',
-            'color-green-rgb-light':  '75, 178, 130',
-            'color-green-light':      'hsla(162, 42%, 46%, 1)',
-            'color-cyan-rgb-light':   '85, 175, 195',
-            'color-cyan-light':       'hsla(195, 45%, 48%, 1)',
-            'color-blue-rgb-light':   '80, 155, 195',
-            'color-blue-light':       'hsla(200, 55%, 44%, 1)',
-            'color-purple-rgb-light': '125, 110, 190',
-            'color-purple-light':     'hsla(248, 38%, 58%, 1)',
-            'color-pink-rgb-light':   '200, 105, 125',
-            'color-pink-light':       'hsla(347, 42%, 58%, 1)',
-        },
-        'dark': {
-            # Grayscale: deep midnight (hue ~220-230)
-            'color-d-gray-10':  'hsla(210, 25%, 85%, 1)',
-            'color-d-gray-20':  'hsla(212, 20%, 74%, 1)',
-            'color-d-gray-30':  'hsla(214, 16%, 65%, 1)',
-            'color-d-gray-40':  'hsla(216, 14%, 52%, 1)',
-            'color-d-gray-50':  'hsla(218, 14%, 42%, 1)',
-            'color-d-gray-60':  'hsla(220, 16%, 28%, 1)',
-            'color-d-gray-70':  'hsla(222, 18%, 22%, 1)',
-            'color-d-gray-80':  'hsla(224, 20%, 17%, 1)',
-            'color-d-gray-90':  'hsla(226, 22%, 15%, 1)',
-            'color-d-gray-100': 'hsla(228, 24%, 13%, 1)',
-            'color-d-gray-110': 'hsla(229, 26%, 12%, 1)',
-            'color-d-gray-120': 'hsla(230, 28%, 11%, 1)',
-            'color-d-gray-130': 'hsla(232, 32%, 9%, 1)',
-            'color-d-gray-140': 'hsla(234, 38%, 7%, 1)',
-            'color-d-alpha-gray': 'hsla(218, 14%, 42%, 0.2)',
-            # Red → Soft Rose
-            'color-d-red-10':  'hsla(350, 85%, 72%, 1)',
-            'color-d-red-20':  'hsla(348, 82%, 66%, 1)',
-            'color-d-red-30':  'hsla(347, 78%, 60%, 1)',
-            'color-d-red-40':  'hsla(345, 65%, 50%, 1)',
-            'color-d-alpha-red': 'hsla(347, 75%, 60%, 0.2)',
-            # Orange
-            'color-d-orange-10': 'hsla(28, 80%, 58%, 1)',
-            'color-d-orange-20': 'hsla(25, 78%, 50%, 1)',
-            'color-d-orange-30': 'hsla(22, 75%, 46%, 1)',
-            'color-d-orange-40': 'hsla(20, 72%, 40%, 1)',
-            'color-d-alpha-orange': 'hsla(25, 85%, 50%, 0.2)',
-            # Yellow → Amber
-            'color-d-yellow-10': 'hsla(40, 70%, 62%, 1)',
-            'color-d-yellow-20': 'hsla(38, 78%, 52%, 1)',
-            'color-d-yellow-30': 'hsla(36, 76%, 48%, 1)',
-            'color-d-yellow-40': 'hsla(34, 72%, 42%, 1)',
-            'color-d-alpha-yellow': 'hsla(38, 85%, 50%, 0.2)',
-            # Green → Emerald
-            'color-d-green-10': 'hsla(162, 50%, 54%, 1)',
-            'color-d-green-20': 'hsla(164, 55%, 42%, 1)',
-            'color-d-green-30': 'hsla(166, 65%, 30%, 1)',
-            'color-d-green-40': 'hsla(168, 62%, 26%, 1)',
-            'color-d-alpha-green': 'hsla(164, 55%, 40%, 0.2)',
-            # Blue → Cyan
-            'color-d-blue-10':  'hsla(192, 55%, 62%, 1)',
-            'color-d-blue-20':  'hsla(194, 58%, 55%, 1)',
-            'color-d-blue-30':  'hsla(197, 50%, 48%, 1)',
-            'color-d-blue-40':  'hsla(200, 48%, 40%, 1)',
-            'color-d-alpha-blue': 'hsla(194, 55%, 50%, 0.2)',
-            # Purple → Lavender
-            'color-d-purple-10': 'hsla(250, 52%, 70%, 1)',
-            'color-d-purple-20': 'hsla(248, 48%, 58%, 1)',
-            'color-d-purple-30': 'hsla(246, 45%, 52%, 1)',
-            'color-d-purple-40': 'hsla(244, 42%, 46%, 1)',
-            'color-d-alpha-purple': 'hsla(248, 70%, 65%, 0.2)',
-            # Accent
-            'accent-h-dark': '215',
-            'accent-s-dark': '25%',
-            'accent-l-dark': '22%',
-            # Special colors (dark)
-            'color-gray-rgb-dark':   '155, 162, 172',
-            'color-gray-dark':       'rgb(155, 162, 172)',
-            'color-red-rgb-dark':    '215, 95, 105',
-            'color-red-dark':        'rgb(190, 80, 85)',
-            'color-orange-rgb-dark': '225, 155, 85',
-            'color-orange-dark':     'rgb(195, 125, 55)',
-            'color-yellow-rgb-dark': '235, 195, 75',
-            'color-yellow-dark':     'rgb(215, 170, 60)',
-            'color-green-rgb-dark':  '85, 190, 120',
-            'color-green-dark':      'rgb(70, 185, 100)',
-            'color-cyan-rgb-dark':   '80, 175, 185',
-            'color-cyan-dark':       'rgb(65, 168, 178)',
-            'color-blue-rgb-dark':   '85, 150, 190',
-            'color-blue-dark':       'rgb(60, 132, 172)',
-            'color-purple-rgb-dark': '130, 115, 190',
-            'color-purple-dark':     'rgb(110, 95, 185)',
-            'color-pink-rgb-dark':   '210, 110, 130',
-            'color-pink-dark':       'rgb(175, 95, 100)',
+        self._leaves = {}
+
+    def _index_blocks(self):
+        """Record comment spans and every selector block with its nesting path."""
+        self.comments = []
+        self.blocks = []
+        self._path_starts = [0]
+        self._paths = [()]
+        stack = []
+        selector_start = 0
+        for token in TOKEN.finditer(self.content):
+            text = token.group()
+            if text in ('{', '}'):
+                if text == '{':
+                    selector = ' '.join(self.content[selector_start:token.start()].split())
+                    stack.append((selector, token.start()))
+                elif stack:
+                    selector, start = stack.pop()
+                    path = tuple(s for s, _ in stack) + (selector,)
+                    self.blocks.append((start, token.end(), path))
+                self._path_starts.append(token.end())
+                self._paths.append(tuple(s for s, _ in stack))
+            elif text != ';':
+                self.comments.append(token.span())
+            selector_start = token.end()
+        self.blocks.sort()
+        self.unclosed = [selector for selector, _ in stack]
+        self._comment_starts = [start for start, _ in self.comments]
+
+    def _in_comment(self, pos: int) -> bool:
+        i = bisect_right(self._comment_starts, pos) - 1
+        return i >= 0 and pos < self.comments[i][1]
+
+    def path_at(self, pos: int) -> tuple:
+        """The selector path of the innermost block containing `pos`."""
+        return self._paths[bisect_right(self._path_starts, pos) - 1]
+
+    def line_of(self, pos: int) -> int:
+        return self.content.count('\n', 0, pos) + 1
+
+    def find_spans(self, sub: Substitution) -> list:
+        """Locate every value span a substitution matches, in file order."""
+        pattern = VALUE_PATTERNS[sub.kind]
+        found = []
+        for (start, end), section, _ in self.locations.get(sub.var, []):
+            if sub.section is not None and section != sub.section:
+                continue
+            match = pattern.match(self.content, start, end)
+            if match:
+                found.append(match.span())
+        return found
+
+    def defaults(self) -> dict:
+        """The template's own primitive values, as a palette definition."""
+        palette = {'name': TEMPLATE_NAME, 'light': {}, 'dark': {}}
+        for mode, subs in SUBSTITUTIONS.items():
+            for sub in subs:
+                spans = self.spans[sub.key]
+                if spans:
+                    start, end = spans[0]
+                    palette[mode][sub.key] = self.content[start:end]
+        return palette
+
+    def structure_errors(self) -> list:
+        """Problems with the template's block structure."""
+        errors = [f'unclosed block {selector!r}' for selector in self.unclosed]
+        top_level = [path[0] for _, _, path in self.blocks if len(path) == 1]
+        for selector in SECTION_BLOCKS:
+            count = top_level.count(selector)
+            if count != 1:
+                errors.append(f'expected one top-level {selector} block, found {count}')
+        return errors
+
+    def drift(self, palette: dict) -> dict:
+        """
+        Report how a palette's keys land in the template:
+          applied   key replaced exactly one declaration
+          missed    key matched nothing, so the template value stays
+          multiple  {key: count} key matched more than one declaration
+          misplaced {key: [block]} declaration outside its mode's block
+          unset     template primitive the palette leaves at its default
+        """
+        report = {'applied': [], 'missed': [], 'multiple': {}, 'misplaced': {}, 'unset': []}
+        for mode, subs in SUBSTITUTIONS.items():
+            values = palette[mode]
+            for sub in subs:
+                found = self.matches[sub.key]
+                if not values.get(sub.key):
+                    if found:
+                        report['unset'].append(sub.key)
+                    continue
+                if not found:
+                    report['missed'].append(sub.key)
+                    continue
+                if len(found) > 1:
+                    report['multiple'][sub.key] = len(found)
+                else:
+                    report['applied'].append(sub.key)
+                if sub.section is None:
+                    outside = [
+                        ' '.join(path) for _, section, path in self.locations[sub.var]
+                        if section != mode
+                    ]
+                    if outside:
+                        report['misplaced'][sub.key] = outside
+        return report
+
+    def value(self, section: str, var: str):
+        """The first declared value of a variable in a section, or None."""
+        spans = self.declarations.get((section, var))
+        if not spans:
+            return None
+        start, end = spans[0]
+        return self.content[start:end].strip()
+
+    def leaf(self, mode: str, var: str) -> str:
+        """Follow plain `var(--x)` aliases from a variable to the one that holds its value."""
+        key = (mode, var)
+        if key not in self._leaves:
+            seen = set()
+            while var not in self.primitive_keys[mode] and var not in seen:
+                seen.add(var)
+                alias = ALIAS.fullmatch(self.value(mode, var) or '')
+                if not alias:
+                    break
+                var = alias.group(1)
+            self._leaves[key] = var
+        return self._leaves[key]
+
+    def resolve(self, palette: dict, mode: str, var: str):
+        """
+        Statically resolve a variable to its color value for a palette,
+        or None when it is undeclared. Colors built from the accent
+        H/S/L parts have their calc() evaluated; anything else (such
+        as color-mix()) is returned unevaluated.
+        """
+        var = self.leaf(mode, var)
+        key = self.primitive_keys[mode].get(var)
+        if key and palette[mode].get(key):
+            return palette[mode][key]
+        raw = self.value(mode, var)
+        if raw and ACCENT_PART.search(raw):
+            accent = {part: self.resolve(palette, mode, f'accent-{part}') for part in 'hsl'}
+            raw = ACCENT_PART.sub(lambda m: accent[m.group(1)], raw)
+            raw = CALC.sub(_calc, raw)
+        return raw
+
+    def declaration_lines(self, names) -> list:
+        """
+        Sorted spans of every declaration of the given variables,
+        widened to the whole line when the declaration stands alone on it.
+        """
+        content = self.content
+        spans = []
+        for name in names:
+            for (value_start, value_end), _, _ in self.locations.get(name, ()):
+                start = content.rfind(f'--{name}', 0, value_start)
+                end = value_end + 1
+                line_start = content.rfind('\n', 0, start) + 1
+                if not content[line_start:start].strip():
+                    line_end = content.find('\n', end)
+                    if line_end != -1 and not content[end:line_end].strip():
+                        start, end = line_start, line_end + 1
+                spans.append((start, end))
+        return sorted(spans)
+
+    def stable(self, mode: str, var: str) -> bool:
+        """
+        Whether a variable has one fixed value on body in a mode: declared
+        once at the top level of the mode's section and never in a nested
+        block (such as `&.is-mobile`) that could override it there.
+        """
+        own = 0
+        for _, section, path in self.locations.get(var, ()):
+            if section not in (mode, 'body'):
+                continue
+            if len(path) > 1:
+                return False
+            own += section == mode
+        return own == 1
+
+    def flatten(self, palette: dict, mode: str, keep=()) -> dict:
+        """
+        Statically resolve the var() chains of a mode's top-level
+        declarations for a palette. Every var() naming a stable variable
+        not in `keep` is replaced by that variable's own flattened value,
+        and calc()s that become plain arithmetic are evaluated.
+        Returns {value span: flattened value} for the declarations that
+        change.
+        """
+        keys = self.primitive_keys[mode]
+        values = {}
+
+        def substitute(match, seen):
+            value = flat(match.group(1), seen)
+            return ' '.join(value.split()) if value else match.group()
+
+        def flat(var, seen):
+            if var in values:
+                return values[var]
+            if var in keep or var in seen or not self.stable(mode, var):
+                return None
+            key = keys.get(var)
+            if key and palette[mode].get(key):
+                raw = palette[mode][key]
+            else:
+                raw = self.value(mode, var)
+            seen = seen | {var}
+            value = VAR.sub(lambda m: substitute(m, seen), raw)
+            values[var] = CALC.sub(_calc, value) if value != raw else raw
+            return values[var]
+
+        edits = {}
+        for (section, var), spans in self.declarations.items():
+            if section != mode:
+                continue
+            for start, end in spans:
+                raw = self.content[start:end].strip()
+                if 'var(' not in raw or len(self.path_at(start)) > 1:
+                    continue
+                value = VAR.sub(lambda m: substitute(m, frozenset()), raw)
+                value = CALC.sub(_calc, value)
+                if value != raw:
+                    edits[(start, end)] = value
+        return edits
+
+    def render(self, palette: dict, prune=(), flatten=None, profile=None) -> str:
+        """
+        Return the template with the palette's primitives substituted,
+        the declarations of the `prune` variables removed and the value
+        spans in `flatten` (see flatten()) replaced. A Profile records
+        the time and match count of each substitution group.
+        """
+        edits = [(start, end, f'in {palette["name"]}') for start, end in self.header_spans]
+        for mode, subs in SUBSTITUTIONS.items():
+            values = palette[mode]
+            for group, members in groupby(subs, key=attrgetter('group')):
+                started = time.perf_counter()
+                count = len(edits)
+                for sub in members:
+                    value = values.get(sub.key)
+                    if value:
+                        edits.extend((start, end, value) for start, end in self.spans[sub.key])
+                if profile is not None:
+                    profile.record(f'{mode} {group}', started, 'substitute', matches=len(edits) - count)
+        started = time.perf_counter()
+        if flatten:
+            edits = [edit for edit in edits if edit[:2] not in flatten]
+            edits.extend((start, end, value) for (start, end), value in flatten.items())
+        if prune:
+            dropped = self.declaration_lines(prune)
+            starts = [start for start, _ in dropped]
+
+            def kept(edit):
+                i = bisect_right(starts, edit[0])
+                return i == 0 or dropped[i - 1][1] <= edit[0]
+
+            edits = [edit for edit in edits if kept(edit)]
+            edits.extend((start, end, '') for start, end in dropped)
+        edits.sort()
+
+        pieces = []
+        pos = 0
+        for start, end, value in edits:
+            pieces.append(self.content[pos:start])
+            pieces.append(value)
+            pos = end
+        pieces.append(self.content[pos:])
+        rendered = ''.join(pieces)
+        if profile is not None:
+            profile.record('splice', started, 'render', edits=len(edits))
+        return rendered
+
+    def pattern_matches(self, palette: dict) -> dict:
+        """{key: declarations replaced} for every key the palette sets."""
+        return {
+            sub.key: len(self.spans[sub.key])
+            for mode, subs in SUBSTITUTIONS.items() for sub in subs
+            if palette[mode].get(sub.key)
         }
-    },
+
+
+def apply_palette(original_content: str, palette: dict, prune=()) -> str:
+    """Replace color primitive HSL values in the palette file."""
+    return PaletteTemplate(original_content).render(palette, prune)
+
+
+# ─────────────────────────────────────────────
+# PROFILING
+# --profile times every stage of a run and, per palette, each
+# substitution group of the light and dark sections. Spans nest
+# by time, so the Chrome trace shows palettes containing their
+# groups; the JSON export also sums them per stage and group.
+# ─────────────────────────────────────────────
+
+class Profile:
+    """Timed spans of one generation run, plus the bytes it read and wrote."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self.palette = None
+        self.patterns = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def record(self, name: str, started: float, category: str = 'stage', **args) -> None:
+        """Add a span from perf_counter() `started` until now."""
+        ended = time.perf_counter()
+        if self.palette is not None and category != 'palette':
+            args['palette'] = self.palette
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'start_ms': (started - self.origin) * 1000,
+            'ms': (ended - started) * 1000,
+            'args': args,
+        })
+
+    @contextmanager
+    def span(self, name: str, category: str = 'stage', **args):
+        started = time.perf_counter()
+        yield args
+        self.record(name, started, category, **args)
+
+    def read(self, path: str) -> None:
+        self.bytes_read += os.path.getsize(path)
+
+    def report(self) -> dict:
+        """The run as JSON: totals, per-stage and per-palette breakdowns, and the raw spans."""
+        stages = {}
+        palettes = {}
+        for event in self.events:
+            category, name, ms = event['cat'], event['name'], event['ms']
+            if category == 'palette':
+                palettes.setdefault(name, {})['ms'] = round(ms, 3)
+                continue
+            total = stages.setdefault(f'{category}: {name}', {'ms': 0, 'count': 0})
+            total['ms'] += ms
+            total['count'] += 1
+            slug = event['args'].get('palette')
+            if slug is None:
+                continue
+            entry = palettes.setdefault(slug, {}).setdefault('stages', {})
+            entry[name] = {'ms': round(ms, 3), **{k: v for k, v in event['args'].items() if k != 'palette'}}
+        for slug, patterns in self.patterns.items():
+            palettes.setdefault(slug, {})['patterns'] = patterns
+        return {
+            'total_ms': round((time.perf_counter() - self.origin) * 1000, 3),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'stages': {
+                name: {'ms': round(total['ms'], 3), 'count': total['count']}
+                for name, total in sorted(stages.items(), key=lambda item: -item[1]['ms'])
+            },
+            'palettes': palettes,
+            'events': [
+                {**event, 'start_ms': round(event['start_ms'], 4), 'ms': round(event['ms'], 4)}
+                for event in self.events
+            ],
+        }
+
+    def trace(self) -> dict:
+        """The spans as Chrome trace events, for chrome://tracing or ui.perfetto.dev."""
+        return {
+            'traceEvents': [
+                {
+                    'name': event['name'],
+                    'cat': event['cat'],
+                    'ph': 'X',
+                    'ts': round(event['start_ms'] * 1000, 1),
+                    'dur': round(event['ms'] * 1000, 1),
+                    'pid': os.getpid(),
+                    'tid': 1,
+                    'args': event['args'],
+                }
+                for event in self.events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+
+# ─────────────────────────────────────────────
+# BATCH GENERATION
+# Palettes fan out across a process pool; each worker parses
+# the template once. A palette is skipped when its hash (palette
+# + template) and the output file's stat match the manifest
+# written by the previous run, so unchanged files keep their mtime.
+# ─────────────────────────────────────────────
+
+MANIFEST = os.path.join(PALETTES_DIR, '.generated.json')
+
+_worker_template = None
+
+
+def output_path(slug: str) -> str:
+    return os.path.join(PALETTES_DIR, f'_{slug}.scss')
+
+
+def flat_path(slug: str) -> str:
+    return os.path.join(PALETTES_DIR, f'_{slug}-flat.scss')
+
+
+def palette_hash(palette: dict, template_hash: str) -> str:
+    """Hash a palette definition together with the template it renders into."""
+    digest = hashlib.sha256(template_hash.encode())
+    digest.update(json.dumps(palette, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def file_stamp(path: str):
+    """(size, mtime_ns) of a file, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def write_atomic(path: str, content: str):
+    """Write through a temp file and rename, so readers never see a partial file."""
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+def load_manifest() -> dict:
+    try:
+        with open(MANIFEST, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _init_worker(template_content: str):
+    global _worker_template
+    _worker_template = PaletteTemplate(template_content)
+
+
+def _generate_one(slug: str, palette: dict, prune=(), profile=None) -> tuple:
+    path = output_path(slug)
+    if profile is None:
+        write_atomic(path, _worker_template.render(palette, prune))
+        return slug, file_stamp(path)
+
+    profile.palette = slug
+    with profile.span(slug, 'palette'):
+        content = _worker_template.render(palette, prune, profile=profile).encode('utf-8')
+        with profile.span('write', 'io', bytes=len(content)):
+            tmp = f'{path}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(content)
+            os.replace(tmp, path)
+    profile.palette = None
+    profile.patterns[slug] = _worker_template.pattern_matches(palette)
+    profile.bytes_written += len(content)
+    return slug, file_stamp(path)
+
+
+def generate_palettes(template: PaletteTemplate, palettes: dict, jobs: int = 1, force: bool = False,
+                      prune=(), profile=None) -> dict:
+    """
+    Write `_<slug>.scss` for every palette whose output is stale,
+    leaving out the declarations of the `prune` variables. With a
+    Profile every palette is rendered in this process.
+    Returns {slug: 'written' | 'unchanged'}.
+    """
+    prune = sorted(prune)
+    digest = hashlib.sha256(template.content.encode())
+    digest.update(','.join(prune).encode())
+    template_hash = digest.hexdigest()
+    manifest = load_manifest()
+
+    status = {}
+    pending = {}
+    for slug, palette in palettes.items():
+        key = palette_hash(palette, template_hash)
+        entry = manifest.get(slug, {})
+        if not force and entry.get('hash') == key and entry.get('stamp') == file_stamp(output_path(slug)):
+            status[slug] = 'unchanged'
+        else:
+            pending[slug] = key
+
+    if not pending:
+        return status
+
+    if jobs > 1 and len(pending) > 1 and profile is None:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)),
+                                 initializer=_init_worker,
+                                 initargs=(template.content,)) as pool:
+            results = list(pool.map(_generate_one, pending, [palettes[slug] for slug in pending],
+                                    [prune] * len(pending)))
+    else:
+        global _worker_template
+        _worker_template = template
+        results = [_generate_one(slug, palettes[slug], prune, profile) for slug in pending]
+
+    for slug, stamp in results:
+        manifest[slug] = {'hash': pending[slug], 'stamp': stamp}
+        status[slug] = 'written'
+    write_atomic(MANIFEST, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    return status
+
+
+# ─────────────────────────────────────────────
+# CSS SNIPPETS
+# A palette rendered straight to CSS: only the .theme-light /
+# .theme-dark primitive declarations, with no Sass compile.
+# Loaded as an Obsidian snippet (or appended after theme.css),
+# it overrides the base theme's primitives; everything derived
+# from them follows through var().
+# ─────────────────────────────────────────────
+
+SNIPPETS_DIR = os.path.join(os.path.dirname(__file__), '..', 'snippets')
+
+GROUP_TITLES = {
+    'grayscale': 'Grayscale',
+    'semantic': 'Semantic Colors',
+    'accent': 'Accent',
+    'special': 'Special Colors',
 }
 
 
-DARK_SPLIT = '/*\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\u2500\n            Dark Palette'
+def snippet_path(slug: str) -> str:
+    return os.path.join(SNIPPETS_DIR, f'palette_{slug}.css')
 
-def split_light_dark(content):
-    """Safely split content into light and dark sections using the header comment."""
-    parts = content.split(DARK_SPLIT, 1)
-    return parts[0], DARK_SPLIT + parts[1] if len(parts) > 1 else ''
 
-def apply_palette(original_content: str, palette: dict) -> str:
-    """Replace color primitive HSL values in the palette file."""
-    content = original_content
-    
-    # Replace palette name in header
-    content = content.replace('in Classic Original', f'in {palette["name"]}')
-    
-    light = palette['light']
-    dark = palette['dark']
-    
-    # Replace light grayscale
-    for key in [f'color-l-gray-{n}' for n in [10,20,30,40,50,60,70,80,90,100,110,120,130,140]]:
-        if key in light:
-            # Match: --color-l-gray-XX: hsla(...);
-            pattern = rf'(--{key}:\s*)hsla\([^)]+\)'
-            content = re.sub(pattern, rf'\g<1>{light[key]}', content)
-    
-    # Replace light alpha gray
-    if 'color-l-alpha-gray' in light:
-        pattern = r'(--color-l-alpha-gray:\s*)hsla\([^)]+\)'
-        content = re.sub(pattern, rf'\g<1>{light["color-l-alpha-gray"]}', content)
-    
-    # Replace light semantic colors
-    for color in ['red', 'orange', 'yellow', 'green', 'blue', 'purple']:
-        for shade in [10, 20, 30, 40]:
-            key = f'color-l-{color}-{shade}'
-            if key in light:
-                pattern = rf'(--{key}:\s*)hsla\([^)]+\)'
-                content = re.sub(pattern, rf'\g<1>{light[key]}', content)
-        alpha_key = f'color-l-alpha-{color}'
-        if alpha_key in light:
-            pattern = rf'(--{alpha_key}:\s*)hsla\([^)]+\)'
-            content = re.sub(pattern, rf'\g<1>{light[alpha_key]}', content)
-    
-    # Replace light accent (in .theme-light only - first occurrence)
-    if 'accent-h-light' in light:
-        # Split on the dark palette section header comment, not the CSS class
-        split_marker = '/*───────────────────────────────────\n            Dark Palette'
-        parts = content.split(split_marker, 1)
-        light_section = parts[0]
-        dark_section = split_marker + parts[1] if len(parts) > 1 else ''
-        
-        light_section = re.sub(r'(--accent-h:\s*)\d+', rf'\g<1>{light["accent-h-light"]}', light_section)
-        light_section = re.sub(r'(--accent-s:\s*)\d+%', rf'\g<1>{light["accent-s-light"]}', light_section)
-        light_section = re.sub(r'(--accent-l:\s*)\d+%', rf'\g<1>{light["accent-l-light"]}', light_section)
-        
-        content = light_section + dark_section
-    
-    # Replace light special colors
-    special_map = {
-        'color-gray-rgb-light':   ('--color-gray-rgb:', light.get('color-gray-rgb-light', '')),
-        'color-gray-light':       ('--color-gray:', light.get('color-gray-light', '')),
-        'color-red-rgb-light':    ('--color-red-rgb:', light.get('color-red-rgb-light', '')),
-        'color-red-light':        ('--color-red:', light.get('color-red-light', '')),
-        'color-orange-rgb-light': ('--color-orange-rgb:', light.get('color-orange-rgb-light', '')),
-        'color-orange-light':     ('--color-orange:', light.get('color-orange-light', '')),
-        'color-yellow-rgb-light': ('--color-yellow-rgb:', light.get('color-yellow-rgb-light', '')),
-        'color-yellow-light':     ('--color-yellow:', light.get('color-yellow-light', '')),
-        'color-green-rgb-light':  ('--color-green-rgb:', light.get('color-green-rgb-light', '')),
-        'color-green-light':      ('--color-green:', light.get('color-green-light', '')),
-        'color-cyan-rgb-light':   ('--color-cyan-rgb:', light.get('color-cyan-rgb-light', '')),
-        'color-cyan-light':       ('--color-cyan:', light.get('color-cyan-light', '')),
-        'color-blue-rgb-light':   ('--color-blue-rgb:', light.get('color-blue-rgb-light', '')),
-        'color-blue-light':       ('--color-blue:', light.get('color-blue-light', '')),
-        'color-purple-rgb-light': ('--color-purple-rgb:', light.get('color-purple-rgb-light', '')),
-        'color-purple-light':     ('--color-purple:', light.get('color-purple-light', '')),
-        'color-pink-rgb-light':   ('--color-pink-rgb:', light.get('color-pink-rgb-light', '')),
-        'color-pink-light':       ('--color-pink:', light.get('color-pink-light', '')),
+def render_blocks(palette: dict, scope: str = '') -> list:
+    """
+    Lines of the .theme-light / .theme-dark blocks declaring a palette's
+    primitives. `scope` is appended to both selectors, e.g. a class.
+    """
+    lines = []
+    for mode, subs in SUBSTITUTIONS.items():
+        values = palette[mode]
+        lines.append('')
+        lines.append(f'.theme-{mode}{scope} {{')
+        group = None
+        for sub in subs:
+            value = values.get(sub.key)
+            if not value:
+                continue
+            if sub.group != group:
+                if group is not None:
+                    lines.append('')
+                lines.append(f'    /* {GROUP_TITLES[sub.group]} */')
+                group = sub.group
+            lines.append(f'    --{sub.var}: {value};')
+        lines.append('}')
+    return lines
+
+
+def render_css(palette: dict) -> str:
+    """Render a palette's color primitives as a standalone CSS override."""
+    lines = [
+        '/*',
+        '――――――――――――――――――――――――――――――――――――――――――――――',
+        f'{palette["name"]} palette for Primary',
+        '  generated by scripts/generate-palettes.py',
+        '――――――――――――――――――――――――――――――――――――――――――――――',
+        '',
+        'Overrides only the color primitives of the',
+        'Primary theme. Enable it as a CSS snippet.',
+        '',
+        '*/',
+    ]
+    lines += render_blocks(palette)
+    return '\n'.join(lines) + '\n'
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Atomically write `content` unless the file already holds it."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    write_atomic(path, content)
+    return True
+
+
+def write_snippets(palettes: dict) -> dict:
+    """
+    Write `snippets/palette_<slug>.css` for every palette.
+    Returns {slug: 'written' | 'unchanged'}; unchanged files are not touched.
+    """
+    return {
+        slug: 'written' if write_if_changed(snippet_path(slug), render_css(palette)) else 'unchanged'
+        for slug, palette in palettes.items()
     }
+
+
+# ─────────────────────────────────────────────
+# PALETTE BUNDLE
+# Every palette's primitives in one partial, each scoped to a
+# body class (.theme-light.pmr-palette-<slug>) on top of the
+# shared structure compiled from index.scss. A generated
+# class-select in style-settings.css switches between them at
+# runtime, so one theme.css carries every palette.
+# ─────────────────────────────────────────────
+
+BUNDLE = os.path.join(PALETTES_DIR, '_bundle.scss')
+STYLE_SETTINGS = os.path.join(os.path.dirname(__file__), '..', 'src', 'css', 'style-settings.css')
+BUNDLE_CLASS_PREFIX = 'pmr-palette-'
+BUNDLE_DEFAULT = f'{BUNDLE_CLASS_PREFIX}default'
+SETTINGS_BEGIN = '    # >>> palette bundle, generated by scripts/generate-palettes.py --bundle'
+SETTINGS_END = '    # <<< palette bundle'
+SETTINGS_ANCHOR = '\t\ttitle: Interface\n'
+
+
+def render_bundle(palettes: dict) -> str:
+    """Render the scoped primitives of every palette as one SCSS partial."""
+    lines = [
+        '/*───────────────────────────────────',
+        '',
+        'Palette bundle',
+        'generated by scripts/generate-palettes.py --bundle',
+        '',
+        'Each block overrides the color primitives',
+        'when its palette is picked under',
+        'Style Settings → Interface → Color Palette.',
+        '',
+        '───────────────────────────────────*/',
+    ]
+    for slug, palette in palettes.items():
+        lines.append('')
+        lines.append(f'/*────────── {palette["name"]} ──────────*/')
+        lines += render_blocks(palette, f'.{BUNDLE_CLASS_PREFIX}{slug}')
+    return '\n'.join(lines) + '\n'
+
+
+def render_settings(palettes: dict) -> str:
+    """The Style Settings class-select entry for the bundled palettes."""
+    lines = [
+        SETTINGS_BEGIN,
+        '    -',
+        '        id: interface_palette',
+        '        type: heading',
+        '        level: 2',
+        '        collapsed: true',
+        '        title: Color Palette',
+        '    -',
+        '        id: pmr-palette',
+        '        type: class-select',
+        '        title: Color Palette',
+        "        description: Swaps the theme's color primitives for one of the bundled palettes without rebuilding the theme.",
+        '        allowEmpty: false',
+        f'        default: {BUNDLE_DEFAULT}',
+        '        options:',
+        '            -',
+        '                label: Default',
+        f'                value: {BUNDLE_DEFAULT}',
+    ]
+    for slug, palette in palettes.items():
+        lines += [
+            '            -',
+            f'                label: {json.dumps(palette["name"], ensure_ascii=False)}',
+            f'                value: {BUNDLE_CLASS_PREFIX}{slug}',
+        ]
+    lines.append(SETTINGS_END)
+    return '\n'.join(lines) + '\n'
+
+
+def update_settings(settings: str, entry: str) -> str:
+    """Replace the generated block in style-settings.css, or insert it under the Interface heading."""
+    begin = settings.find(SETTINGS_BEGIN)
+    if begin != -1:
+        end = settings.index(SETTINGS_END, begin) + len(SETTINGS_END) + 1
+        return settings[:begin] + entry + settings[end:]
+    anchor = settings.index(SETTINGS_ANCHOR) + len(SETTINGS_ANCHOR)
+    return settings[:anchor] + entry + settings[anchor:]
+
+
+def write_bundle(template: PaletteTemplate, palettes: dict) -> dict:
+    """
+    Write _bundle.scss and its style-settings.css entry. Classic Original
+    is always bundled first so it can be picked over another base palette.
+    Returns {path: 'written' | 'unchanged'}.
+    """
+    bundled = {TEMPLATE_SLUG: template.defaults(), **palettes}
+    with open(STYLE_SETTINGS, 'r', encoding='utf-8') as f:
+        settings = update_settings(f.read(), render_settings(bundled))
+    return {
+        path: 'written' if write_if_changed(path, content) else 'unchanged'
+        for path, content in [(BUNDLE, render_bundle(bundled)), (STYLE_SETTINGS, settings)]
+    }
+
+
+def print_drift(template: PaletteTemplate, palettes: dict, verbose: bool = False) -> int:
+    """Print where palettes fail to land in the template; returns the problem count."""
+    problems = 0
+    for error in template.structure_errors():
+        print(f"\n❌ Template: {error}")
+        problems += 1
+    for slug, palette in palettes.items():
+        drift = template.drift(palette)
+        issues = len(drift['missed']) + len(drift['multiple']) + len(drift['misplaced'])
+        problems += issues
+        if verbose:
+            mark = '❌' if issues else '✅'
+            print(f"\n{mark} {palette['name']}: {len(drift['applied'])} applied, {len(drift['missed'])} missed, "
+                  f"{len(drift['multiple'])} multiple, {len(drift['unset'])} left at template value")
+        elif issues:
+            print(f"\n⚠️  {palette['name']}: {issues} key(s) did not apply cleanly")
+        for key in drift['missed']:
+            print(f"   missed:    {key} matched no declaration")
+        for key, count in drift['multiple'].items():
+            print(f"   multiple:  {key} matched {count} declarations")
+        for key, blocks in drift['misplaced'].items():
+            print(f"   misplaced: {key} declared in {', '.join(blocks)}")
+        if verbose:
+            for key in drift['unset']:
+                print(f"   unset:     {key}")
+    return problems
+
+
+def print_profile(profile: Profile, args):
+    """Summarize a profiled run and write its JSON report and Chrome trace."""
+    report = profile.report()
+    print(f"\n⏱️  Profile: {report['total_ms']:.1f} ms, {report['bytes_read'] / 1024:.1f} KB read, "
+          f"{report['bytes_written'] / 1024:.1f} KB written")
+    for name, total in report['stages'].items():
+        print(f"   {total['ms']:9.3f} ms  {name}" + (f" (×{total['count']})" if total['count'] > 1 else ''))
+    for path, data in [(args.profile, report), (args.trace, profile.trace())]:
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+                f.write('\n')
+            print(f"   📄 Written to {path}")
+
+
+def check_template(palettes: dict) -> int:
+    """Print the template's structural index and every palette's drift report."""
+    with open(ORIGINAL, 'r', encoding='utf-8') as f:
+        template = PaletteTemplate(f.read())
+
+    print("🧭 Template structure")
+    for start, _, path in template.blocks:
+        if path[0] in SECTION_BLOCKS:
+            print(f"   line {template.line_of(start):>5}  {' '.join(path)}")
+    problems = print_drift(template, palettes, verbose=True)
+    return 1 if problems else 0
+
+
+def watch(only, interval: float):
+    """
+    Regenerate palettes as the template or palette files change, until
+    interrupted. The parsed template and loaded palettes stay in memory
+    and palettes are rendered in this process, since a pool's workers
+    would re-parse the template on every cycle; a template change
+    re-renders every palette, a palette file change only its own
+    `_<slug>.scss`. Files are polled by size and mtime.
+    """
+    template = None
+    template_stamp = None
+    palettes = {}
+    stamps = {}
+
+    print("👀 Watching the template and scripts/palettes/ (Ctrl+C to stop)")
+    try:
+        while True:
+            changed = set()
+
+            stamp = file_stamp(ORIGINAL)
+            if stamp != template_stamp:
+                template_stamp = stamp
+                with open(ORIGINAL, 'r', encoding='utf-8') as f:
+                    candidate = PaletteTemplate(f.read())
+                errors = candidate.structure_errors()
+                if errors:
+                    print(f"\n❌ Template not regenerated: {'; '.join(errors)}")
+                else:
+                    template = candidate
+                    changed.update(palettes)
+
+            try:
+                files = palette_files()
+            except PaletteError as e:
+                print(f"\n❌ {e}")
+                files = {}
+            if only:
+                files = {slug: path for slug, path in files.items() if slug in only}
+            for slug in set(palettes) - set(files):
+                del palettes[slug]
+                stamps.pop(slug, None)
+                print(f"\n🗑️  {slug} removed; _{slug}.scss left in place")
+            for slug, path in files.items():
+                stamp = file_stamp(path)
+                if stamps.get(slug) == stamp:
+                    continue
+                stamps[slug] = stamp
+                try:
+                    palettes[slug] = load_palette(path)
+                except PaletteError as e:
+                    print(f"\n❌ {e}")
+                    continue
+                changed.add(slug)
+
+            if changed and template is not None:
+                batch = {slug: palettes[slug] for slug in sorted(changed) if slug in palettes}
+                start = time.perf_counter()
+                print_drift(template, batch)
+                status = generate_palettes(template, batch)
+                elapsed = (time.perf_counter() - start) * 1000
+                for slug, state in status.items():
+                    if state == 'written':
+                        print(f"\n🖌️  Generated: {batch[slug]['name']} → _{slug}.scss ({elapsed:.0f} ms)")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching.")
+
+
+def audit(args, palettes: dict) -> int:
+    """Run the contrast audit; returns the process exit code."""
+    from css_vars import MAIN_CSS
+    from palette_audit import AUDIT_PAIRS, audit_palettes, theme_pairs
+
+    with open(ORIGINAL, 'r', encoding='utf-8') as f:
+        template = PaletteTemplate(f.read())
+    pairs = list(AUDIT_PAIRS)
+    if os.path.exists(MAIN_CSS):
+        with open(MAIN_CSS, 'r', encoding='utf-8') as f:
+            listed = {pair[:2] for pair in pairs}
+            pairs += [pair for pair in theme_pairs(f.read()) if pair[:2] not in listed]
+    report = audit_palettes(
+        template, palettes,
+        thresholds={'text': args.min_contrast, 'ui': args.min_ui_contrast},
+        min_apca=args.min_apca,
+        pairs=pairs,
+    )
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print("🔍 Primary Theme Palette Audit")
+        print("=" * 40)
+        for slug, entry in report['palettes'].items():
+            mark = '❌' if entry['failures'] else '✅'
+            print(f"\n{mark} {entry['name']}: {entry['failures']} of {len(entry['results'])} pair(s) below threshold")
+            for result in entry['results']:
+                if not result['pass']:
+                    print(f"   {result['mode']:5} {result['foreground']} on {result['background']}: "
+                          f"{result['wcag']}:1, Lc {result['apca']}")
+        unresolved = sorted({(pair['foreground'], pair['background']) for pair in report['unresolved']})
+        if unresolved:
+            print(f"\n⚠️  {len(unresolved)} pair(s) could not be resolved statically "
+                  "(color-mix(), or variables the palette template does not declare)")
+            for fg, bg in unresolved:
+                print(f"   {fg} on {bg}")
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+            print(f"\n📄 Report written to {args.report}")
+
+    return 1 if report['failures'] else 0
+
+
+def build_index(template: PaletteTemplate, palettes: dict):
+    """OKLab nearest-neighbour index over Classic Original and the palettes."""
+    from palette_index import PaletteIndex
+
+    defaults = template.defaults()
+    keys = {mode: [sub.key for sub in subs if sub.kind == 'hsla'] for mode, subs in SUBSTITUTIONS.items()}
+    return PaletteIndex({TEMPLATE_SLUG: defaults, **palettes}, defaults, keys)
+
+
+def similar(args, palettes: dict) -> int:
+    """Answer --nearest / --duplicates from the palette index; returns the process exit code."""
+    with open(ORIGINAL, 'r', encoding='utf-8') as f:
+        template = PaletteTemplate(f.read())
+    start = time.perf_counter()
+    index = build_index(template, palettes)
+    elapsed = (time.perf_counter() - start) * 1000
+    names = dict(zip(index.slugs, index.names))
+
+    print("🧭 Primary Theme Palette Index")
+    print("=" * 40)
+    print(f"\n   {len(index.slugs)} palette(s), {index.colors} primitive(s) each, indexed in {elapsed:.0f} ms")
+
+    if args.nearest:
+        start = time.perf_counter()
+        if args.nearest in names:
+            found = [(distance, slug, None) for distance, slug in index.nearest_palette(args.nearest, args.neighbors)]
+            print(f"\n🎯 Closest to {names[args.nearest]} (RMS ΔE over every primitive)")
+        else:
+            try:
+                found = index.nearest_color(args.nearest, args.neighbors)
+            except ValueError:
+                print(f"\n❌ {args.nearest!r} is neither a palette slug nor a color", file=sys.stderr)
+                return 1
+            print(f"\n🎯 Accent colors closest to {args.nearest} (ΔE)")
+        elapsed = (time.perf_counter() - start) * 1000
+        for distance, slug, mode in found:
+            where = f', {mode} accent' if mode else ''
+            print(f"   {distance:.4f}  {names[slug]} ({slug}{where})")
+        print(f"   ({elapsed:.2f} ms)")
+
+    if args.duplicates is not None:
+        pairs = index.duplicates(args.duplicates)
+        mark = '⚠️ ' if pairs else '✅'
+        print(f"\n{mark} {len(pairs)} pair(s) of palettes within ΔE {args.duplicates}")
+        for distance, a, b in pairs:
+            print(f"   {distance:.4f}  {names[a]} ({a}) ≈ {names[b]} ({b})")
+        return 1 if pairs else 0
+    return 0
+
+
+# ─────────────────────────────────────────────
+# DERIVED PALETTES
+# A new palette file from a few seed colors: gray-10 and
+# gray-140 span each mode's gray ramp, shade 20 of each
+# semantic color its four shades (see palette_colors.py).
+# Seeds left out keep Classic Original's values.
+# ─────────────────────────────────────────────
+
+def seed_keys(mode: str) -> list:
+    m = mode[0]
+    return [f'color-{m}-gray-10', f'color-{m}-gray-140'] + [f'color-{m}-{c}-20' for c in SEMANTIC_COLORS]
+
+
+def parse_seeds(specs: list) -> dict:
+    """{mode: {key: color}} from KEY=COLOR arguments; raises PaletteError."""
+    from palette_colors import parse_color
+
+    seeds = {'light': {}, 'dark': {}}
+    for spec in specs:
+        key, _, value = spec.partition('=')
+        key, value = key.strip(), value.strip()
+        mode = next((mode for mode in seeds if key in seed_keys(mode)), None)
+        if mode is None:
+            raise PaletteError(f'{key!r} is not a seed; seeds are ' + ', '.join(seed_keys('light') + seed_keys('dark')))
+        try:
+            parse_color(value)
+        except ValueError as e:
+            raise PaletteError(f'{key}: {e}') from e
+        seeds[mode][key] = value
+    return seeds
+
+
+def derive_palette(defaults: dict, name: str, seeds: dict) -> dict:
+    """A palette whose gray and semantic ramps are derived from `seeds` over `defaults` (both by mode)."""
+    from palette_colors import derive_gray_ramp, derive_semantic_ramp, format_hsla, palette_array
+
+    palette = {'name': name, 'light': {}, 'dark': {}}
+    for mode in ('light', 'dark'):
+        m = mode[0]
+        keys, rows = palette_array({mode: {**defaults[mode], **seeds[mode]}}, mode, seed_keys(mode))
+        grays = derive_gray_ramp(rows[0], rows[1], mode).reshape(-1, 4)
+        shades = derive_semantic_ramp(rows[2:], mode).reshape(-1, 4)
+        derived = [f'color-{m}-gray-{step}' for step in GRAY_STEPS] + [
+            f'color-{m}-{color}-{shade}' for color in SEMANTIC_COLORS for shade in SEMANTIC_SHADES
+        ]
+        palette[mode] = dict(zip(derived, format_hsla(grays) + format_hsla(shades)))
+    return palette
+
+
+def render_palette_file(palette: dict) -> str:
+    """A palette as TOML in the style of scripts/palettes/, each color annotated with its hex."""
+    from palette_colors import hsl_to_rgb, parse_colors, rgb_to_hex
+
+    lines = [f'# ───── {palette["name"]} ─────', f'name = {json.dumps(palette["name"], ensure_ascii=False)}']
+    for mode in ('light', 'dark'):
+        values = palette[mode]
+        width = max(len(key) for key in values)
+        hexes = rgb_to_hex(hsl_to_rgb(parse_colors(values.values())))
+        lines += ['', f'[{mode}]']
+        lines += [f'{key:<{width}} = "{value}"  # {hex}' for (key, value), hex in zip(values.items(), hexes)]
+    return '\n'.join(lines) + '\n'
+
+
+def derive(args) -> int:
+    """Write scripts/palettes/<slug>.toml for --derive; returns the process exit code."""
+    from palette_colors import hsl_to_rgb, parse_colors, rgb_to_oklch
+
+    print("🌱 Primary Theme Palette Derivation")
+    print("=" * 40)
+    slug = args.derive
+    path = os.path.join(PALETTE_DATA_DIR, f'{slug}.toml')
+    if not PALETTE_SLUG.fullmatch(slug):
+        print(f"\n❌ {slug!r}: palette slugs are lowercase letters, digits and hyphens", file=sys.stderr)
+        return 1
+    try:
+        existing = palette_files().get(slug)
+    except PaletteError as e:
+        print(f"\n❌ {e}", file=sys.stderr)
+        return 1
+    if existing and not args.force:
+        print(f"\n❌ {os.path.relpath(existing)} already exists (--force replaces it)", file=sys.stderr)
+        return 1
+    try:
+        seeds = parse_seeds(args.seed or [])
+    except PaletteError as e:
+        print(f"\n❌ {e}", file=sys.stderr)
+        return 1
+
+    with open(ORIGINAL, 'r', encoding='utf-8') as f:
+        defaults = PaletteTemplate(f.read()).defaults()
+    name = args.name or ' '.join(word.capitalize() for word in slug.split('-'))
+    palette = derive_palette(defaults, name, seeds)
+    errors = validate_palette(palette)
+    if errors:
+        print("\n❌ " + '\n   '.join(errors), file=sys.stderr)
+        return 1
+
+    for mode in ('light', 'dark'):
+        grays = [palette[mode][f'color-{mode[0]}-gray-{step}'] for step in GRAY_STEPS]
+        lightness = rgb_to_oklch(hsl_to_rgb(parse_colors(grays)))[:, 0]
+        if (lightness[1:] >= lightness[:-1]).any():
+            print(f"\n⚠️  The {mode} gray ramp does not darken at every step: "
+                  f"gray-10 should be the lighter seed")
+    if existing and existing != path:
+        os.remove(existing)
+    write_atomic(path, render_palette_file(palette))
+    given = sum(len(mode_seeds) for mode_seeds in seeds.values())
+    derived = len(palette['light']) + len(palette['dark'])
+    print(f"\n🖌️  Derived: {name} → {os.path.relpath(path)} ({derived} color(s) from {given} seed(s), "
+          f"the rest from {TEMPLATE_NAME})")
+    print(f"\nGenerate it with: python3 scripts/generate-palettes.py --only {slug}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate color palette variants for Primary Obsidian Theme.')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='worker processes for batch generation (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='rewrite every palette even if its output is up to date')
+    parser.add_argument('--css', action='store_true',
+                        help='emit CSS snippets with only the color primitives instead of SCSS files')
+    parser.add_argument('--bundle', action='store_true',
+                        help='emit every palette as a class-scoped block in _bundle.scss, selectable in Style Settings')
+    parser.add_argument('--check-rgb', action='store_true',
+                        help='check that every color-*-rgb triple agrees with its HSL counterpart (needs NumPy)')
+    parser.add_argument('--audit', action='store_true',
+                        help='audit text/background contrast of every palette in both modes (needs NumPy)')
+    parser.add_argument('--min-contrast', type=float, default=4.5,
+                        help='minimum WCAG contrast ratio for text pairs (default: 4.5)')
+    parser.add_argument('--min-ui-contrast', type=float, default=3.0,
+                        help='minimum WCAG contrast ratio for faint text, icons and headings (default: 3.0)')
+    parser.add_argument('--min-apca', type=float, default=0,
+                        help='also fail pairs whose APCA |Lc| is below this value (default: off)')
+    parser.add_argument('--report', metavar='PATH',
+                        help="write the audit report as JSON to PATH ('-' for stdout)")
+    parser.add_argument('--nearest', metavar='QUERY',
+                        help='list the palettes closest in OKLab to a palette slug, or whose accent is closest '
+                             'to a color (#rrggbb, hsl(), rgb()) (needs NumPy)')
+    parser.add_argument('-k', '--neighbors', type=int, default=5,
+                        help='how many palettes --nearest lists (default: 5)')
+    parser.add_argument('--duplicates', type=float, nargs='?', const=0.02, metavar='DELTA_E',
+                        help='list pairs of palettes whose primitives differ by less than this RMS OKLab ΔE '
+                             '(default: 0.02, about one just-noticeable difference) (needs NumPy)')
+    parser.add_argument('--prune', action='store_true',
+                        help='leave out declarations of variables the theme never reads (see find-unused-vars.py)')
+    parser.add_argument('--flatten', nargs='+', choices=['light', 'dark'], metavar='MODE',
+                        help='also write _<slug>-flat.scss with the var() chains of these modes '
+                             '(light, dark) resolved wherever Style Settings cannot change them')
+    parser.add_argument('--profile', metavar='PATH',
+                        help='time every stage and, per palette, each substitution group, and write the profile '
+                             'as JSON to PATH (renders every palette, in this process)')
+    parser.add_argument('--trace', metavar='PATH',
+                        help='also write the profile as a Chrome trace (chrome://tracing, ui.perfetto.dev)')
+    parser.add_argument('--check-template', action='store_true',
+                        help='report the template structure and which palette keys applied, missed or matched twice')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and regenerate palettes whose template or definition changes')
+    parser.add_argument('--interval', type=float, default=0.1,
+                        help='seconds between change checks in --watch mode (default: 0.1)')
+    parser.add_argument('--derive', metavar='SLUG',
+                        help='write scripts/palettes/<SLUG>.toml with gray and semantic ramps derived from '
+                             '--seed colors (needs NumPy)')
+    parser.add_argument('--seed', action='append', metavar='KEY=COLOR',
+                        help='a seed for --derive: color-l-gray-10, color-l-gray-140, color-l-<color>-20 '
+                             'or their color-d- counterparts (repeatable; unset seeds keep Classic Original\'s)')
+    parser.add_argument('--name', help='display name of the --derive palette (default: from its slug)')
+    parser.add_argument('--only', nargs='+', metavar='SLUG',
+                        help='only load and process these palettes (default: every file in scripts/palettes/)')
+    args = parser.parse_args()
+
+    profile = Profile() if args.profile or args.trace else None
+
+    def stage(name: str):
+        return profile.span(name) if profile else nullcontext()
+
+    if args.derive:
+        sys.exit(derive(args))
+
+    try:
+        with stage('load'):
+            palettes = load_palettes(args.only)
+    except PaletteError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    if profile:
+        files = palette_files()
+        for slug in palettes:
+            profile.read(files[slug])
+
+    if args.audit:
+        sys.exit(audit(args, palettes))
+
+    if args.nearest or args.duplicates is not None:
+        sys.exit(similar(args, palettes))
+
+    print("🎨 Primary Theme Palette Generator")
+    print("=" * 40)
     
-    # Apply special color replacements in light section only
-    light_section, dark_section = split_light_dark(content)
-    
-    for key, (var_prefix, value) in special_map.items():
-        if value:
-            # Match the variable and its value up to semicolon
-            pattern = rf'({re.escape(var_prefix)}\s*)[^;]+(?=;)'
-            light_section = re.sub(pattern, rf'\g<1>{value}', light_section, count=1)
-    
-    content = light_section + dark_section
+    if args.check_template:
+        sys.exit(check_template(palettes))
     
-    # ── DARK MODE ──
+    if args.watch:
+        watch(args.only, args.interval)
+        return
     
-    # Replace dark grayscale
-    for key in [f'color-d-gray-{n}' for n in [10,20,30,40,50,60,70,80,90,100,110,120,130,140]]:
-        if key in dark:
-            pattern = rf'(--{key}:\s*)hsla\([^)]+\)'
-            content = re.sub(pattern, rf'\g<1>{dark[key]}', content)
+    if args.check_rgb:
+        from palette_colors import rgb_mismatches
+        failed = False
+        for slug, palette in palettes.items():
+            mismatches = rgb_mismatches(palette)
+            mark = '❌' if mismatches else '✅'
+            print(f"\n{mark} {palette['name']}: {len(mismatches)} RGB mismatch(es)")
+            for mode, name, rgb, expected in mismatches:
+                print(f"   {mode:5} color-{name}-rgb: {rgb} but color-{name} is {expected}")
+            failed = failed or bool(mismatches)
+        sys.exit(1 if failed else 0)
     
-    if 'color-d-alpha-gray' in dark:
-        pattern = r'(--color-d-alpha-gray:\s*)hsla\([^)]+\)'
-        content = re.sub(pattern, rf'\g<1>{dark["color-d-alpha-gray"]}', content)
+    if args.css:
+        status = write_snippets(palettes)
+        for slug, palette in palettes.items():
+            verb = 'Generated' if status[slug] == 'written' else 'Up to date'
+            print(f"\n🖌️  {verb}: {palette['name']} → snippets/palette_{slug}.css")
+        print("\n🎉 Done! Enable a snippet in Obsidian under Appearance → CSS snippets,")
+        print("or append it after theme.css.")
+        return
     
-    # Replace dark semantic colors
-    for color in ['red', 'orange', 'yellow', 'green', 'blue', 'purple']:
-        for shade in [10, 20, 30, 40]:
-            key = f'color-d-{color}-{shade}'
-            if key in dark:
-                pattern = rf'(--{key}:\s*)hsla\([^)]+\)'
-                content = re.sub(pattern, rf'\g<1>{dark[key]}', content)
-        alpha_key = f'color-d-alpha-{color}'
-        if alpha_key in dark:
-            pattern = rf'(--{alpha_key}:\s*)hsla\([^)]+\)'
-            content = re.sub(pattern, rf'\g<1>{dark[alpha_key]}', content)
+    with stage('template'):
+        with open(ORIGINAL, 'r', encoding='utf-8') as f:
+            template = PaletteTemplate(f.read())
+    if profile:
+        profile.read(ORIGINAL)
     
-    # Replace dark accent
-    if 'accent-h-dark' in dark:
-        # Only replace in dark section
-        light_section, dark_section = split_light_dark(content)
-        
-        dark_section = re.sub(r'(--accent-h:\s*)\d+', rf'\g<1>{dark["accent-h-dark"]}', dark_section)
-        dark_section = re.sub(r'(--accent-s:\s*)\d+%', rf'\g<1>{dark["accent-s-dark"]}', dark_section)
-        dark_section = re.sub(r'(--accent-l:\s*)\d+%', rf'\g<1>{dark["accent-l-dark"]}', dark_section)
-        
-        content = light_section + dark_section
+    if args.bundle:
+        if args.only:
+            # The bundle and its class-select list the whole library
+            try:
+                palettes = load_palettes()
+            except PaletteError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                sys.exit(1)
+            print("\n⚠️  --only is ignored with --bundle: every palette is bundled")
+        status = write_bundle(template, palettes)
+        for path, state in status.items():
+            verb = 'Generated' if state == 'written' else 'Up to date'
+            print(f"\n🖌️  {verb}: {os.path.relpath(path)}")
+        print(f"\n🎉 Done! Bundled {len(palettes) + 1} palette(s) into one theme.css.")
+        print("Pick one under Style Settings → Interface → Color Palette.")
+        print("\nThen build with: npx grunt")
+        return
     
-    # Replace dark special colors
-    dark_special_map = {
-        'color-gray-rgb-dark':   '--color-gray-rgb:',
-        'color-red-rgb-dark':    '--color-red-rgb:',
-        'color-orange-rgb-dark': '--color-orange-rgb:',
-        'color-yellow-rgb-dark': '--color-yellow-rgb:',
-        'color-green-rgb-dark':  '--color-green-rgb:',
-        'color-cyan-rgb-dark':   '--color-cyan-rgb:',
-        'color-blue-rgb-dark':   '--color-blue-rgb:',
-        'color-purple-rgb-dark': '--color-purple-rgb:',
-        'color-pink-rgb-dark':   '--color-pink-rgb:',
-        'color-gray-dark':       '--color-gray:',
-        'color-red-dark':        '--color-red:',
-        'color-orange-dark':     '--color-orange:',
-        'color-yellow-dark':     '--color-yellow:',
-        'color-green-dark':      '--color-green:',
-        'color-cyan-dark':       '--color-cyan:',
-        'color-blue-dark':       '--color-blue:',
-        'color-purple-dark':     '--color-purple:',
-        'color-pink-dark':       '--color-pink:',
-    }
+    prune = ()
+    if args.prune:
+        from css_vars import theme_graph
+        prune = theme_graph().dead()
+        print(f"\n✂️  Pruning {len(prune)} unread variable(s): {', '.join(prune)}")
     
-    light_section, dark_section = split_light_dark(content)
+    print_drift(template, palettes)
+    with stage('generate'):
+        status = generate_palettes(template, palettes, jobs=args.jobs, force=args.force or profile is not None,
+                                   prune=prune, profile=profile)
     
-    for key, var_prefix in dark_special_map.items():
-        if key in dark:
-            pattern = rf'({re.escape(var_prefix)}\s*)[^;]+(?=;)'
-            dark_section = re.sub(pattern, rf'\g<1>{dark[key]}', dark_section, count=1)
+    for slug, palette in palettes.items():
+        if status[slug] == 'written':
+            print(f"\n🖌️  Generated: {palette['name']} → _{slug}.scss")
+        else:
+            print(f"\n⏭️  Up to date: {palette['name']} → _{slug}.scss")
     
-    content = light_section + dark_section
+    if args.flatten:
+        from css_vars import theme_graph, tunable_variables
+        # Snippets (--css) override the primitives over any built theme
+        snippet_vars = {var for mode in args.flatten for var in template.primitive_keys[mode]}
+        keep = tunable_variables(theme_graph(), snippet_vars)
+        for slug, palette in palettes.items():
+            with stage(f'flatten {slug}'):
+                flatten = {}
+                for mode in args.flatten:
+                    flatten.update(template.flatten(palette, mode, keep))
+                before = sum(template.content.count('var(', start, end) for start, end in flatten)
+                after = sum(value.count('var(') for value in flatten.values())
+                content = template.render(palette, prune, flatten)
+                if write_if_changed(flat_path(slug), content) and profile:
+                    profile.bytes_written += len(content.encode('utf-8'))
+            print(f"\n🧮 Flattened: {palette['name']} → _{slug}-flat.scss "
+                  f"({len(flatten)} declaration(s), {before} → {after} var() read(s))")
     
-    return content
-
+    if profile:
+        print_profile(profile, args)
 
-def main():
-    print("🎨 Primary Theme Palette Generator")
-    print("=" * 40)
-    
-    # Read original
-    with open(ORIGINAL, 'r') as f:
-        original = f.read()
-    
-    for slug, palette in PALETTES.items():
-        output_file = os.path.join(PALETTES_DIR, f'_{slug}.scss')
-        print(f"\n🖌️  Generating: {palette['name']} → _{slug}.scss")
-        
-        result = apply_palette(original, palette)
-        
-        with open(output_file, 'w') as f:
-            f.write(result)
-        
-        print(f"   ✅ Written to {output_file}")
-    
-    print(f"\n🎉 Done! Generated {len(PALETTES)} palette(s).")
+    written = sum(1 for state in status.values() if state == 'written')
+    print(f"\n🎉 Done! Generated {written} of {len(palettes)} palette(s).")
     print("\nTo use a palette, update src/scss/index.scss:")
     print("  @use '10_foundations/palettes/<palette-name>';")
+    if args.flatten:
+        print("or its resolved-values build:")
+        print("  @use '10_foundations/palettes/<palette-name>-flat';")
     print("\nThen build with: npx grunt")
 
 
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Order-preserving declaration deduplication for the compiled theme.
+
+cssmin runs with restructuring off because its merges can reorder
+the cascade. This pass only makes changes whose result can be shown
+not to change it:
+
+-   a declaration repeated verbatim later in the same rule is dropped,
+    since the later copy overrides it
+-   a rule whose declarations repeat an earlier rule's exactly, in the
+    same at-rule context, is folded into that earlier rule's selector
+    list, but only when no rule in between touches any of the same
+    properties (shorthands and longhands count as the same property)
+
+Afterwards both stylesheets are reduced to a canonical cascade, per
+property group the ordered sequence of (context, selectors,
+declarations), and compared. The output is only written when they
+are equivalent.
+
+The Grunt `dedupe` task runs it on src/css/main.min.css after
+cssmin, before the theme is concatenated.
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from css_rules import declaration_property, declarations, iter_rules, split_top_level
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+MAIN_MIN_CSS = os.path.join(ROOT, 'src', 'css', 'main.min.css')
+
+# ─────────────────────────────────────────────
+# PROPERTY GROUPS
+# Declarations in the same group may override each other, so
+# their relative order must be kept. Grouping is deliberately
+# coarse: a false conflict only costs a missed merge.
+# ─────────────────────────────────────────────
+
+VENDOR_PREFIX = re.compile(r'^-(?:webkit|moz|ms|o)-')
+GROUP_ALIASES = {
+    'top': 'inset', 'right': 'inset', 'bottom': 'inset', 'left': 'inset',
+    'gap': 'grid', 'row-gap': 'grid', 'column-gap': 'grid',
+    'align': 'place', 'justify': 'place',
+    'width': 'size', 'height': 'size', 'min': 'size', 'max': 'size', 'inline': 'size', 'block': 'size',
+    'line-height': 'font',
+    'white-space': 'text', 'word-wrap': 'overflow', 'columns': 'column',
+}
+
+
+def property_group(name: str) -> str:
+    if name.startswith('--'):
+        return name
+    if name == 'all':
+        return '*'
+    name = VENDOR_PREFIX.sub('', name)
+    head = name.split('-')[0]
+    return GROUP_ALIASES.get(name, GROUP_ALIASES.get(head, head))
+
+
+def conflicts(groups: set, others: set) -> bool:
+    if groups & others:
+        return True
+    return ('*' in others and any(not g.startswith('--') for g in groups)) or \
+           ('*' in groups and any(not g.startswith('--') for g in others))
+
+
+def dedupe(decls: list) -> list:
+    """Drop declarations repeated verbatim later in the same block."""
+    seen = set()
+    kept = []
+    for decl in reversed(decls):
+        key = normalize(decl)
+        if key not in seen:
+            seen.add(key)
+            kept.append(decl)
+    return kept[::-1]
+
+
+def normalize(decl: str) -> str:
+    name, _, value = decl.partition(':')
+    return f"{name.strip().lower()}:{' '.join(value.split())}"
+
+
+# ─────────────────────────────────────────────
+# OPTIMIZATION
+# ─────────────────────────────────────────────
+
+def optimize(css: str) -> tuple:
+    """Return (optimized css, stats)."""
+    rules = []
+    for rule in iter_rules(css):
+        body_start = rule.end - 1 - len(rule.body)
+        decls = declarations(rule.body)
+        rules.append({
+            'rule': rule,
+            'selectors': split_top_level(css[rule.start:body_start - 1]),
+            'decls': decls,
+            'kept': dedupe(decls),
+            'groups': {property_group(declaration_property(d)) for d in decls},
+            'alive': True,
+        })
+
+    stats = {'rules': len(rules), 'declarations': 0, 'merged': 0}
+    latest = {}
+    for i, entry in enumerate(rules):
+        stats['declarations'] += len(entry['decls']) - len(entry['kept'])
+        if not entry['kept'] or any(':-' in s for s in entry['selectors']):
+            continue
+        key = (entry['rule'].context, tuple(normalize(d) for d in entry['kept']))
+        j = latest.get(key)
+        latest[key] = i
+        if j is None:
+            continue
+        between = range(j + 1, i)
+        if any(conflicts(entry['groups'], rules[k]['groups']) for k in between):
+            continue
+        target = rules[j]
+        target['selectors'] += [s for s in entry['selectors'] if s not in target['selectors']]
+        entry['alive'] = False
+        latest[key] = j
+        stats['merged'] += 1
+
+    edits = []
+    for entry in rules:
+        rule = entry['rule']
+        if not entry['alive']:
+            edits.append((rule.start, rule.end, ''))
+        elif entry['kept'] != entry['decls'] or len(entry['selectors']) != len(rule.selectors):
+            edits.append((rule.start, rule.end, f"{','.join(entry['selectors'])}{{{';'.join(entry['kept'])}}}"))
+
+    pieces = []
+    pos = 0
+    for start, end, text in edits:
+        pieces.append(css[pos:start])
+        pieces.append(text)
+        pos = end
+    pieces.append(css[pos:])
+    return ''.join(pieces), stats
+
+
+# ─────────────────────────────────────────────
+# VERIFICATION
+# ─────────────────────────────────────────────
+
+def canonical_cascade(css: str) -> dict:
+    """
+    Per property group, the ordered (context, selectors, declarations)
+    blocks that set it, with verbatim repeats inside a block dropped
+    and consecutive blocks with the same declarations united.
+    """
+    cascade = {}
+    for rule in iter_rules(css):
+        selectors = frozenset(' '.join(s.split()) for s in rule.selectors)
+        by_group = {}
+        for decl in dedupe(declarations(rule.body)):
+            by_group.setdefault(property_group(declaration_property(decl)), []).append(normalize(decl))
+        for group, decls in by_group.items():
+            sequence = cascade.setdefault(group, [])
+            block = (rule.context, tuple(decls))
+            if sequence and sequence[-1][0] == block:
+                sequence[-1] = (block, sequence[-1][1] | selectors)
+            else:
+                sequence.append((block, selectors))
+    return cascade
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate declarations in the compiled theme without reordering the cascade.')
+    parser.add_argument('css', nargs='?', default=MAIN_MIN_CSS,
+                        help='stylesheet to optimize in place (default: src/css/main.min.css)')
+    parser.add_argument('-o', '--output', metavar='PATH', help='write here instead of in place')
+    parser.add_argument('--check', action='store_true', help='only report what would change')
+    args = parser.parse_args()
+
+    with open(args.css, 'r', encoding='utf-8') as f:
+        css = f.read()
+    optimized, stats = optimize(css)
+
+    print("🧹 Primary Theme CSS Deduplication")
+    print("=" * 40)
+    print(f"\n   {stats['rules']} rules: {stats['declarations']} repeated declaration(s) dropped, "
+          f"{stats['merged']} rule(s) folded into an earlier identical one")
+
+    if canonical_cascade(optimized) != canonical_cascade(css):
+        print("\n❌ The optimized stylesheet does not cascade like the original; nothing written.")
+        sys.exit(1)
+    print(f"\n✅ Cascade verified: {len(css) / 1024:.1f} KB → {len(optimized) / 1024:.1f} KB "
+          f"({len(css) - len(optimized)} bytes saved)")
+
+    if args.check:
+        return
+    output = args.output or args.css
+    if optimized != css or output != args.css:
+        tmp = f'{output}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(optimized)
+        os.replace(tmp, output)
+        print(f"\n🖌️  Written to {os.path.relpath(output)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+In-memory palette rendering, for Python code that wants CSS for a
+palette without running generate-palettes.py or Sass.
+
+A palette's theme is the compiled theme.css followed by .theme-light
+/ .theme-dark blocks declaring the palette's primitives: everything
+derived from them follows through var(), so rendering is string work
+on the ~100 primitive declarations. theme.css is read once and again
+only when it changes on disk.
+
+    from palette_api import ThemeRenderer
+    etag, css = ThemeRenderer().theme({'name': 'Mine', 'light': {...}, 'dark': {...}})
+"""
+
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+THEME_CSS = os.path.join(ROOT, 'theme.css')
+
+
+def load_generator():
+    """Import generate-palettes.py, whose hyphenated name rules out a plain import."""
+    path = os.path.join(os.path.dirname(__file__), 'generate-palettes.py')
+    spec = importlib.util.spec_from_file_location('generate_palettes', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+gen = load_generator()
+PaletteError = gen.PaletteError
+
+
+def check_palette(palette: dict) -> dict:
+    """Return the palette, or raise PaletteError listing its schema errors."""
+    errors = gen.validate_palette(palette)
+    if errors:
+        raise PaletteError('\n'.join(errors))
+    return palette
+
+
+def render_snippet(palette: dict) -> str:
+    """The palette's primitives as a standalone CSS snippet (as generate-palettes.py --css writes)."""
+    return gen.render_css(check_palette(palette))
+
+
+def render_theme(palette: dict, base_css: str) -> str:
+    """A complete theme.css: the compiled base theme with the palette's primitives overriding its own."""
+    return base_css.rstrip('\n') + '\n' + render_snippet(palette)
+
+
+_template = None
+
+
+def render_scss(palette: dict) -> str:
+    """The palette's _<slug>.scss, as generate-palettes.py would write it."""
+    global _template
+    if _template is None:
+        with open(gen.ORIGINAL, 'r', encoding='utf-8') as f:
+            _template = gen.PaletteTemplate(f.read())
+    return _template.render(check_palette(palette))
+
+
+class ThemeRenderer:
+    """
+    Renders palettes into theme.css or snippets, keeping the most
+    recently used `cache_size` results. Each result is keyed, and
+    ETagged, by the hash of the palette together with the base
+    theme it was rendered on. Safe to share between threads.
+    """
+
+    def __init__(self, base_path: str = THEME_CSS, cache_size: int = 64):
+        self.base_path = base_path
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._base = None
+        self._base_stamp = None
+        self._base_hash = None
+
+    def base(self) -> tuple:
+        """(css, hash) of the base theme, re-read when its size or mtime changes."""
+        stamp = gen.file_stamp(self.base_path)
+        if stamp is None:
+            raise FileNotFoundError(f'{self.base_path} not found; build it first with npx grunt')
+        with self._lock:
+            if stamp != self._base_stamp:
+                with open(self.base_path, 'r', encoding='utf-8') as f:
+                    self._base = f.read()
+                self._base_hash = hashlib.sha256(self._base.encode()).hexdigest()
+                self._base_stamp = stamp
+            return self._base, self._base_hash
+
+    def render(self, palette: dict, kind: str = 'theme') -> tuple:
+        """(etag, css) of a palette rendered as 'theme' or 'snippet'."""
+        check_palette(palette)
+        base, base_hash = self.base() if kind == 'theme' else (None, '')
+        etag = gen.palette_hash(palette, f'{kind}:{base_hash}')[:32]
+        with self._lock:
+            css = self.cache.get(etag)
+            if css is not None:
+                self.cache.move_to_end(etag)
+                self.hits += 1
+                return etag, css
+            self.misses += 1
+
+        css = render_theme(palette, base) if kind == 'theme' else render_snippet(palette)
+        with self._lock:
+            self.cache[etag] = css
+            self.cache.move_to_end(etag)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return etag, css
+
+    def theme(self, palette: dict) -> tuple:
+        return self.render(palette, 'theme')
+
+    def snippet(self, palette: dict) -> tuple:
+        return self.render(palette, 'snippet')
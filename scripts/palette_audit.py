@@ -0,0 +1,178 @@
+"""
+Contrast audit for Primary palettes.
+
+Audited pairs come from two places: every rule in the compiled theme
+that sets both `color` and a `background` to theme variables
+(theme_pairs), and the pairs listed below, text drawn on the page
+backgrounds it inherits from an ancestor, which no single rule
+states. Each pair is resolved through the palette template's var()
+chains for each palette and mode, then scored with WCAG 2 contrast
+ratios and APCA Lc values in a single batch of array math.
+
+Translucent colors are scored as they are seen: a background is
+composited over the mode's page background (PAGE_BACKGROUND, itself
+over white or black), and the foreground over the result.
+
+Requires NumPy (pip install numpy).
+"""
+
+import re
+
+import numpy as np
+
+from css_rules import declaration_property, declarations, iter_rules
+from palette_colors import (
+    apca_contrast,
+    composite,
+    hsl_to_rgb,
+    parse_color,
+    wcag_contrast,
+)
+
+# (foreground, background, role)
+# 'text' pairs must meet the text threshold; 'ui' pairs (faint
+# text, tags, icons, large headings) the lower UI threshold.
+BACKGROUNDS = ['background-primary', 'background-secondary']
+AUDIT_PAIRS = [
+    (fg, bg, role)
+    for bg in BACKGROUNDS
+    for fg, role in [
+        ('text-normal', 'text'),
+        ('text-muted', 'text'),
+        ('text-faint', 'ui'),
+        ('text-accent', 'text'),
+        ('text-error', 'text'),
+        ('text-warning', 'ui'),
+        ('text-success', 'ui'),
+        ('bold-color', 'text'),
+        ('italic-color', 'text'),
+        ('link-color', 'text'),
+        ('link-external-color', 'text'),
+        ('tag-color', 'ui'),
+        ('h1-color', 'ui'),
+        ('inline-title-color', 'ui'),
+        ('icon-color', 'ui'),
+    ]
+] + [
+    ('text-on-accent', 'interactive-accent', 'text'),
+    ('text-normal', 'background-primary-alt', 'text'),
+]
+
+THRESHOLDS = {'text': 4.5, 'ui': 3.0}
+
+# What translucent backgrounds are seen over, and what it is seen over
+PAGE_BACKGROUND = 'background-primary'
+CANVAS = {'light': (0.0, 0.0, 1.0, 1.0), 'dark': (0.0, 0.0, 0.0, 1.0)}
+
+# A declaration whose whole value is one theme variable
+VAR_VALUE = re.compile(r'\s*var\(\s*--([\w-]+)\s*(?:,[^()]*)?\)\s*(?:!important)?\s*')
+BACKGROUND_PROPERTIES = ('background', 'background-color')
+# Foregrounds held to the UI threshold
+UI_FOREGROUND = re.compile(r'faint|icon|tag|flair|count|^h\d-|title')
+
+
+def theme_pairs(css: str) -> list:
+    """
+    (foreground, background, role) of every rule in a compiled
+    stylesheet that sets both `color` and a background to theme
+    variables, in first-seen order.
+    """
+    pairs = {}
+    for rule in iter_rules(css):
+        fg = bg = None
+        for decl in declarations(rule.body):
+            match = VAR_VALUE.fullmatch(decl.split(':', 1)[1])
+            if not match:
+                continue
+            name = declaration_property(decl)
+            if name == 'color':
+                fg = match.group(1)
+            elif name in BACKGROUND_PROPERTIES:
+                bg = match.group(1)
+        if fg and bg and fg != bg:
+            pairs.setdefault((fg, bg), 'ui' if UI_FOREGROUND.search(fg) else 'text')
+    return [(fg, bg, role) for (fg, bg), role in pairs.items()]
+
+
+def audit_palettes(template, palettes: dict, thresholds: dict = None, min_apca: float = 0,
+                   pairs: list = AUDIT_PAIRS) -> dict:
+    """
+    Score every (foreground, background, role) pair of every palette
+    in both modes.
+
+    `template` is a PaletteTemplate; `thresholds` maps role to the
+    minimum WCAG ratio; pairs with |Lc| below `min_apca` also fail
+    when it is non-zero. Returns a JSON-serialisable report.
+    """
+    thresholds = {**THRESHOLDS, **(thresholds or {})}
+
+    rows = []
+    fg_colors = []
+    bg_colors = []
+    page_colors = []
+    canvas_colors = []
+    unresolved = []
+    for slug, palette in palettes.items():
+        for mode in ('light', 'dark'):
+            page_value = template.resolve(palette, mode, PAGE_BACKGROUND)
+            try:
+                page_color = parse_color(page_value)
+            except (AttributeError, TypeError, ValueError):
+                page_color = CANVAS[mode]
+            for fg, bg, role in pairs:
+                fg_value = template.resolve(palette, mode, fg)
+                bg_value = template.resolve(palette, mode, bg)
+                try:
+                    if fg_value is None or bg_value is None:
+                        raise ValueError('undeclared')
+                    fg_color = parse_color(fg_value)
+                    bg_color = parse_color(bg_value)
+                except (TypeError, ValueError):
+                    unresolved.append({'palette': slug, 'mode': mode, 'foreground': fg, 'background': bg})
+                    continue
+                rows.append((slug, mode, fg, bg, role, fg_value, bg_value))
+                fg_colors.append(fg_color)
+                bg_colors.append(bg_color)
+                page_colors.append(page_color)
+                canvas_colors.append(CANVAS[mode])
+
+    def rgba(colors):
+        hsla = np.array(colors, dtype=np.float64).reshape(-1, 4)
+        return np.concatenate([hsl_to_rgb(hsla), hsla[:, 3:4]], axis=-1)
+
+    page_rgb = composite(rgba(page_colors), rgba(canvas_colors)[:, :3])
+    bg_rgb = composite(rgba(bg_colors), page_rgb)
+    fg_rgb = composite(rgba(fg_colors), bg_rgb)
+
+    ratios = wcag_contrast(fg_rgb, bg_rgb)
+    lc = apca_contrast(fg_rgb, bg_rgb)
+    minimum = np.array([thresholds[row[4]] for row in rows])
+    passed = ratios >= minimum
+    if min_apca:
+        passed &= np.abs(lc) >= min_apca
+
+    report = {
+        'thresholds': {'wcag': thresholds, 'apca': min_apca},
+        'pairs': len(rows),
+        'failures': int((~passed).sum()),
+        'unresolved': unresolved,
+        'palettes': {
+            slug: {'name': palette['name'], 'failures': 0, 'results': []}
+            for slug, palette in palettes.items()
+        },
+    }
+    for i, (slug, mode, fg, bg, role, fg_value, bg_value) in enumerate(rows):
+        entry = report['palettes'][slug]
+        entry['failures'] += int(not passed[i])
+        entry['results'].append({
+            'mode': mode,
+            'foreground': fg,
+            'background': bg,
+            'role': role,
+            'foreground_value': ' '.join(fg_value.split()),
+            'background_value': ' '.join(bg_value.split()),
+            'wcag': round(float(ratios[i]), 2),
+            'apca': round(float(lc[i]), 1),
+            'pass': bool(passed[i]),
+        })
+    return report
@@ -0,0 +1,307 @@
+"""
+Numeric color model for Primary palettes.
+
+Palette primitives are parsed into (N, 4) float arrays of
+(h, s, l, a) rows -- hue in degrees, the rest in 0..1 -- so whole
+ramps, or thousands of candidate palettes, convert to RGB, hex and
+OKLCH and derive new ramps as array math instead of per-string
+Python loops.
+
+Requires NumPy (pip install numpy). generate-palettes.py only
+imports this module for the commands that need it.
+"""
+
+import re
+
+import numpy as np
+
+# ─────────────────────────────────────────────
+# PARSING
+# ─────────────────────────────────────────────
+
+HSLA = re.compile(
+    r'hsla?\(\s*([-\d.]+)(?:deg)?\s*,\s*([\d.]+)%\s*,\s*([\d.]+)%\s*(?:,\s*([\d.]+)(%?)\s*)?\)'
+)
+RGBA = re.compile(
+    r'rgba?\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*(?:,\s*([\d.]+)(%?)\s*)?\)'
+)
+# Bare `r, g, b` triples, as used by the --color-*-rgb variables
+TRIPLE = re.compile(r'\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*$')
+HEX = re.compile(r'#?([0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})')
+
+
+def _alpha(value, percent) -> float:
+    if value is None:
+        return 1.0
+    return float(value) / 100 if percent else float(value)
+
+
+def parse_color(value: str) -> tuple:
+    """Parse an hsla()/rgb() string, an `r, g, b` triple or a hex color into (h, s, l, a)."""
+    match = HSLA.fullmatch(value.strip())
+    if match:
+        h, s, l, a, percent = match.groups()
+        return float(h) % 360, float(s) / 100, float(l) / 100, _alpha(a, percent)
+
+    match = RGBA.fullmatch(value.strip()) or TRIPLE.fullmatch(value)
+    if match:
+        groups = match.groups()
+        rgb = np.array([float(c) for c in groups[:3]]) / 255
+        a = _alpha(groups[3], groups[4]) if len(groups) > 3 else 1.0
+        h, s, l = rgb_to_hsl(rgb)
+        return float(h), float(s), float(l), a
+
+    match = HEX.fullmatch(value.strip())
+    if match:
+        digits = match.group(1)
+        if len(digits) <= 4:
+            digits = ''.join(c * 2 for c in digits)
+        h, s, l = rgb_to_hsl(np.array([int(digits[i:i + 2], 16) for i in (0, 2, 4)]) / 255)
+        a = int(digits[6:], 16) / 255 if len(digits) == 8 else 1.0
+        return float(h), float(s), float(l), a
+
+    raise ValueError(f'unrecognised color value: {value!r}')
+
+
+def parse_colors(values) -> np.ndarray:
+    """Parse color strings into an (N, 4) array of (h, s, l, a) rows."""
+    return np.array([parse_color(value) for value in values], dtype=np.float64).reshape(-1, 4)
+
+
+def palette_array(palette: dict, mode: str, keys=None) -> tuple:
+    """
+    Collect a palette mode's color primitives as (keys, (N, 4) array).
+    Non-color entries (the accent H/S/L parts) are skipped.
+    """
+    values = palette[mode]
+    keys = [key for key in (keys or values) if key in values and not key.startswith('accent-')]
+    return keys, parse_colors(values[key] for key in keys)
+
+
+# ─────────────────────────────────────────────
+# CONVERSIONS
+# All functions broadcast over leading dimensions.
+# ─────────────────────────────────────────────
+
+def hsl_to_rgb(hsl: np.ndarray) -> np.ndarray:
+    """(..., >=3) h/s/l rows to (..., 3) sRGB in 0..1."""
+    hsl = np.asarray(hsl, dtype=np.float64)
+    h, s, l = hsl[..., 0:1], hsl[..., 1:2], hsl[..., 2:3]
+    k = (np.array([0.0, 8.0, 4.0]) + h / 30) % 12
+    a = s * np.minimum(l, 1 - l)
+    return l - a * np.clip(np.minimum(k - 3, 9 - k), -1, 1)
+
+
+def rgb_to_hsl(rgb: np.ndarray) -> np.ndarray:
+    """(..., 3) sRGB in 0..1 to (..., 3) h/s/l rows."""
+    rgb = np.asarray(rgb, dtype=np.float64)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    high = rgb.max(axis=-1)
+    low = rgb.min(axis=-1)
+    chroma = high - low
+    l = (high + low) / 2
+
+    safe = np.where(chroma == 0, 1, chroma)
+    h = np.where(high == r, ((g - b) / safe) % 6,
+        np.where(high == g, (b - r) / safe + 2, (r - g) / safe + 4)) * 60
+    h = np.where(chroma == 0, 0, h)
+    denom = 1 - np.abs(2 * l - 1)
+    s = np.where(denom == 0, 0, chroma / np.where(denom == 0, 1, denom))
+    return np.stack([h, s, l], axis=-1)
+
+
+def rgb_to_255(rgb: np.ndarray) -> np.ndarray:
+    """Quantize 0..1 sRGB to integer 0..255 channels."""
+    return np.rint(np.clip(rgb, 0, 1) * 255).astype(np.int64)
+
+
+def rgb_to_hex(rgb: np.ndarray) -> list:
+    """(N, 3) sRGB in 0..1 to a list of `#rrggbb` strings."""
+    return ['#%02x%02x%02x' % tuple(row) for row in rgb_to_255(rgb).reshape(-1, 3)]
+
+
+def srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+# https://bottosson.github.io/posts/oklab/
+_LMS = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_OKLAB = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+
+
+def rgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    """(..., 3) sRGB in 0..1 to (..., 3) OKLab (L, a, b)."""
+    lms = srgb_to_linear(rgb) @ _LMS.T
+    return np.cbrt(lms) @ _OKLAB.T
+
+
+def rgb_to_oklch(rgb: np.ndarray) -> np.ndarray:
+    """(..., 3) sRGB in 0..1 to (..., 3) OKLCH (L, C, h in degrees)."""
+    lab = rgb_to_oklab(rgb)
+    c = np.hypot(lab[..., 1], lab[..., 2])
+    h = np.degrees(np.arctan2(lab[..., 2], lab[..., 1])) % 360
+    return np.stack([lab[..., 0], c, h], axis=-1)
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """WCAG relative luminance of (..., 3) sRGB in 0..1."""
+    return srgb_to_linear(rgb) @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def composite(fg_rgba: np.ndarray, bg_rgb: np.ndarray) -> np.ndarray:
+    """Flatten (..., 4) translucent sRGB colors over (..., 3) opaque backgrounds."""
+    alpha = fg_rgba[..., 3:4]
+    return fg_rgba[..., :3] * alpha + bg_rgb * (1 - alpha)
+
+
+def wcag_contrast(fg_rgb: np.ndarray, bg_rgb: np.ndarray) -> np.ndarray:
+    """WCAG 2 contrast ratio (1..21) of (..., 3) sRGB pairs."""
+    a = relative_luminance(fg_rgb)
+    b = relative_luminance(bg_rgb)
+    return (np.maximum(a, b) + 0.05) / (np.minimum(a, b) + 0.05)
+
+
+def apca_contrast(fg_rgb: np.ndarray, bg_rgb: np.ndarray) -> np.ndarray:
+    """
+    APCA lightness contrast (Lc, roughly -108..106) of (..., 3)
+    sRGB pairs, using the APCA-W3 0.0.98G constants. Positive for
+    dark text on light backgrounds, negative for the reverse.
+    """
+    coef = np.array([0.2126729, 0.7151522, 0.0721750])
+
+    def screen_luminance(rgb):
+        y = np.clip(rgb, 0, 1) ** 2.4 @ coef
+        return np.where(y < 0.022, y + np.maximum(0.022 - y, 0) ** 1.414, y)
+
+    y_text = screen_luminance(fg_rgb)
+    y_bg = screen_luminance(bg_rgb)
+    normal = (y_bg ** 0.56 - y_text ** 0.57) * 1.14
+    reverse = (y_bg ** 0.65 - y_text ** 0.62) * 1.14
+    lc = np.where(
+        y_bg > y_text,
+        np.where(normal < 0.1, 0, normal - 0.027),
+        np.where(reverse > -0.1, 0, reverse + 0.027),
+    )
+    return np.where(np.abs(y_bg - y_text) < 0.0005, 0, lc) * 100
+
+
+def format_hsla(hsla: np.ndarray) -> list:
+    """(N, 4) rows back to `hsla(h, s%, l%, a)` strings in the palette file style."""
+    def number(x):
+        return f'{x:.1f}'.rstrip('0').rstrip('.')
+
+    rows = np.asarray(hsla, dtype=np.float64).reshape(-1, 4)
+    return [
+        f'hsla({number(h % 360)}, {number(s * 100)}%, {number(l * 100)}%, {number(a)})'
+        for h, s, l, a in rows
+    ]
+
+
+# ─────────────────────────────────────────────
+# DERIVED RAMPS
+# Lightness profiles and shade offsets are taken from
+# Classic Original, so derived ramps keep its contrast
+# progression between steps.
+# ─────────────────────────────────────────────
+
+GRAY_LIGHTNESS = {
+    'light': np.array([98, 96, 92, 90, 88, 83, 70, 60, 50, 40, 37, 30, 24, 17]) / 100,
+    'dark': np.array([85, 74, 68, 55, 46, 33, 25, 19, 17, 15, 14, 13, 11, 9]) / 100,
+}
+GRAY_SATURATION = {
+    'light': np.array([38, 36, 37, 34, 35, 38, 37, 29, 23, 28, 30, 32, 45, 54]) / 100,
+    'dark': np.array([48, 39, 31, 27, 24, 27, 27, 22, 20, 19, 17, 16, 18, 21]) / 100,
+}
+
+# Shades 10..40 relative to shade 20: lightness offset, saturation ratio
+SHADE_LIGHTNESS = {
+    'light': np.array([0.11, 0.0, -0.10, -0.22]),
+    'dark': np.array([0.09, 0.0, -0.06, -0.12]),
+}
+SHADE_SATURATION = {
+    'light': np.array([0.85, 1.0, 0.95, 1.3]),
+    'dark': np.array([1.0, 1.0, 1.0, 1.0]),
+}
+
+
+def derive_gray_ramp(lightest: np.ndarray, darkest: np.ndarray, mode: str) -> np.ndarray:
+    """
+    Derive 14-step gray ramps (gray-10 .. gray-140) from seed pairs.
+
+    `lightest` and `darkest` are (N, 4) rows for gray-10 and gray-140.
+    Hue follows the shortest arc between them. Lightness follows
+    Classic Original's profile, rescaled to the seeds' range, and
+    saturation the same profile's dips and rises around the line
+    between the seeds, so Classic Original's own ends give back its
+    ramp. Returns (N, 14, 4).
+    """
+    lightest = np.atleast_2d(np.asarray(lightest, dtype=np.float64))[:, None, :]
+    darkest = np.atleast_2d(np.asarray(darkest, dtype=np.float64))[:, None, :]
+    profile = GRAY_LIGHTNESS[mode]
+    t = (profile[0] - profile) / (profile[0] - profile[-1])
+    t = t[None, :]
+
+    dh = (darkest[..., 0] - lightest[..., 0] + 180) % 360 - 180
+    h = (lightest[..., 0] + dh * t) % 360
+    shape = GRAY_SATURATION[mode]
+    shape = shape / (shape[0] + (shape[-1] - shape[0]) * t)
+    s = np.clip((lightest[..., 1] + (darkest[..., 1] - lightest[..., 1]) * t) * shape, 0, 1)
+    l = lightest[..., 2] + (darkest[..., 2] - lightest[..., 2]) * t
+    a = np.ones_like(h)
+    return np.stack([h, s, l, a], axis=-1)
+
+
+def derive_semantic_ramp(seeds: np.ndarray, mode: str) -> np.ndarray:
+    """
+    Derive 4-shade ramps (shades 10 .. 40) from shade-20 seeds.
+
+    `seeds` is an (N, 4) array; returns (N, 4, 4).
+    """
+    seeds = np.atleast_2d(np.asarray(seeds, dtype=np.float64))[:, None, :]
+    h = np.broadcast_to(seeds[..., 0], (seeds.shape[0], 4))
+    s = np.clip(seeds[..., 1] * SHADE_SATURATION[mode], 0, 1)
+    l = np.clip(seeds[..., 2] + SHADE_LIGHTNESS[mode], 0, 1)
+    a = np.ones_like(l)
+    return np.stack([h, s, l, a], axis=-1)
+
+
+# ─────────────────────────────────────────────
+# CONSISTENCY
+# ─────────────────────────────────────────────
+
+SPECIAL_COLORS = ['gray', 'red', 'orange', 'yellow', 'green', 'cyan', 'blue', 'purple', 'pink']
+
+
+def rgb_mismatches(palette: dict, tolerance: int = 8) -> list:
+    """
+    Compare every `color-<name>-rgb-<mode>` triple with its
+    `color-<name>-<mode>` counterpart. Returns
+    [(mode, name, rgb, expected_rgb)] for pairs whose largest
+    channel difference exceeds `tolerance` (0..255).
+    """
+    mismatches = []
+    for mode in ('light', 'dark'):
+        values = palette[mode]
+        names = [
+            name for name in SPECIAL_COLORS
+            if f'color-{name}-rgb-{mode}' in values and f'color-{name}-{mode}' in values
+        ]
+        if not names:
+            continue
+        triples = parse_colors(values[f'color-{name}-rgb-{mode}'] for name in names)
+        colors = parse_colors(values[f'color-{name}-{mode}'] for name in names)
+        actual = rgb_to_255(hsl_to_rgb(triples))
+        expected = rgb_to_255(hsl_to_rgb(colors))
+        off = np.abs(actual - expected).max(axis=-1) > tolerance
+        for i in np.flatnonzero(off):
+            mismatches.append((mode, names[i], tuple(actual[i].tolist()), tuple(expected[i].tolist())))
+    return mismatches
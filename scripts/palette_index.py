@@ -0,0 +1,274 @@
+"""
+Nearest-neighbour index over Primary palettes in OKLab.
+
+A palette is indexed twice: as one vector of the OKLab coordinates of
+all its grayscale and semantic primitives in both modes, for
+whole-palette similarity and duplicate detection, and as the points
+of its light and dark accent colors, for "closest to this brand
+color" lookups. Distances are OKLab ΔE; for whole palettes the root
+mean square over their primitives, so thresholds mean the same in
+both cases (about 0.02 is a just-noticeable difference).
+
+Requires NumPy (pip install numpy). generate-palettes.py only
+imports this module for --nearest and --duplicates.
+"""
+
+import heapq
+import re
+
+import numpy as np
+
+from palette_colors import hsl_to_rgb, parse_color, rgb_to_oklab
+
+LEAF_SIZE = 32
+PROJECTED_DIMS = 8
+PCA_SAMPLE = 4096
+
+
+# ─────────────────────────────────────────────
+# KD-TREE
+# ─────────────────────────────────────────────
+
+class KDTree:
+    """
+    Exact k-nearest, radius and all-pairs search over (N, D) points.
+
+    The tree splits the points' projection onto their top principal
+    axes, which keeps it effective when D is in the hundreds; leaves
+    are scanned at full dimension. A projection never lengthens a
+    distance, so box distances in it are lower bounds and the search
+    stays exact. Leaves are contiguous rows of `points`, so a leaf
+    scan is one array operation, and a query computes its bound to
+    every box in one go before walking the tree.
+    """
+
+    def __init__(self, points, dims: int = PROJECTED_DIMS, leaf_size: int = LEAF_SIZE):
+        points = np.asarray(points, dtype=np.float64)
+        n, d = points.shape
+        self.mean = points.mean(axis=0) if n else np.zeros(d)
+        centered = points - self.mean
+        if d <= dims:
+            self.axes = np.eye(d)
+        else:
+            sample = centered[::max(1, n // PCA_SAMPLE)]
+            _, _, vt = np.linalg.svd(sample, full_matrices=False)
+            self.axes = vt[:dims].T
+        projected = centered @ self.axes
+
+        self.leaf_size = leaf_size
+        self.order = np.arange(n)
+        # Per node: box corners, row range and children (-1 for leaves)
+        self.nodes = []
+        if n:
+            self._build(projected, 0, n)
+        self.low = np.array([node[0] for node in self.nodes]).reshape(-1, projected.shape[1])
+        self.high = np.array([node[1] for node in self.nodes]).reshape(-1, projected.shape[1])
+        self.ranges = [node[2:4] for node in self.nodes]
+        self.children = [node[4:] for node in self.nodes]
+        self.leaves = [i for i, (left, _) in enumerate(self.children) if left < 0]
+        self.points = points[self.order]
+
+    def _build(self, projected: np.ndarray, start: int, end: int) -> int:
+        rows = projected[self.order[start:end]]
+        low, high = rows.min(axis=0), rows.max(axis=0)
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if end - start <= self.leaf_size:
+            self.nodes[node] = (low, high, start, end, -1, -1)
+            return node
+        axis = int(np.argmax(high - low))
+        mid = (end - start) // 2
+        self.order[start:end] = self.order[start:end][np.argpartition(rows[:, axis], mid)]
+        left = self._build(projected, start, start + mid)
+        right = self._build(projected, start + mid, end)
+        self.nodes[node] = (low, high, start, end, left, right)
+        return node
+
+    def _bounds(self, point: np.ndarray) -> list:
+        """Squared distance from a point to every node's box, in the projection."""
+        projected = (point - self.mean) @ self.axes
+        gap = np.maximum(self.low - projected, 0) + np.maximum(projected - self.high, 0)
+        return np.einsum('ij,ij->i', gap, gap).tolist()
+
+    def query(self, point, k: int = 1) -> tuple:
+        """(distances, indices) of the k nearest points, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        if not self.nodes or k < 1:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        bounds = self._bounds(point)
+        best = []   # max-heap of (-squared distance, row)
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound >= -best[0][0]:
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                heapq.heappush(frontier, (bounds[left], left))
+                heapq.heappush(frontier, (bounds[right], right))
+                continue
+            start, end = self.ranges[node]
+            d2 = ((self.points[start:end] - point) ** 2).sum(axis=1)
+            for i in np.argsort(d2)[:k].tolist():
+                if len(best) < k:
+                    heapq.heappush(best, (-d2[i], start + i))
+                elif d2[i] < -best[0][0]:
+                    heapq.heapreplace(best, (-d2[i], start + i))
+                else:
+                    break
+        best.sort(reverse=True)
+        rows = np.array([row for _, row in best], dtype=np.int64)
+        return np.sqrt([-d2 for d2, _ in best]), self.order[rows]
+
+    def within(self, point, radius: float) -> tuple:
+        """(distances, indices) of every point within `radius`, in no particular order."""
+        point = np.asarray(point, dtype=np.float64)
+        if not self.nodes:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        bounds = self._bounds(point)
+        r2 = radius * radius
+        distances, rows = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if bounds[node] > r2:
+                continue
+            left, right = self.children[node]
+            if left >= 0:
+                stack += (left, right)
+                continue
+            start, end = self.ranges[node]
+            d2 = ((self.points[start:end] - point) ** 2).sum(axis=1)
+            hits = np.flatnonzero(d2 <= r2)
+            distances.append(np.sqrt(d2[hits]))
+            rows.append(start + hits)
+        if not rows:
+            return np.zeros(0), np.zeros(0, dtype=np.int64)
+        return np.concatenate(distances), self.order[np.concatenate(rows)]
+
+    def pairs(self, radius: float) -> tuple:
+        """
+        (distances, i, j) of every pair of points within `radius`,
+        i < j. Each leaf is compared as a block with the leaves whose
+        boxes come within `radius` of its own.
+        """
+        r2 = radius * radius
+        distances, first, second = [], [], []
+        for leaf in self.leaves:
+            gap = np.maximum(self.low - self.high[leaf], 0) + np.maximum(self.low[leaf] - self.high, 0)
+            near = (np.einsum('ij,ij->i', gap, gap) <= r2).tolist()
+            start, end = self.ranges[leaf]
+            block = self.points[start:end]
+            squared = (block ** 2).sum(axis=1)
+            stack = [0]
+            while stack:
+                node = stack.pop()
+                other_start, other_end = self.ranges[node]
+                if not near[node] or other_end <= start:
+                    continue
+                left, right = self.children[node]
+                if left >= 0:
+                    stack += (left, right)
+                    continue
+                other = self.points[other_start:other_end]
+                d2 = squared[:, None] + (other ** 2).sum(axis=1)[None, :] - 2 * block @ other.T
+                a, b = np.nonzero(d2 <= r2)
+                keep = other_start + b > start + a
+                a, b = a[keep], b[keep]
+                distances.append(np.sqrt(np.maximum(d2[a, b], 0)))
+                first.append(self.order[start + a])
+                second.append(self.order[other_start + b])
+        if not distances:
+            empty = np.zeros(0, dtype=np.int64)
+            return np.zeros(0), empty, empty
+        i, j = np.concatenate(first), np.concatenate(second)
+        return np.concatenate(distances), np.minimum(i, j), np.maximum(i, j)
+
+
+# ─────────────────────────────────────────────
+# PALETTE INDEX
+# ─────────────────────────────────────────────
+
+# One hsla()/hsl() per line, as palette primitives are written
+HSL_LINE = re.compile(
+    r'^hsla?\(\s*([-\d.]+)(?:deg)?\s*,\s*([\d.]+)%\s*,\s*([\d.]+)%\s*(?:,\s*[\d.]+%?\s*)?\)$', re.M
+)
+
+
+def parse_hsl(values: list) -> np.ndarray:
+    """(N, 3) h/s/l rows of color strings, with one regex pass when they are all hsl()."""
+    found = HSL_LINE.findall('\n'.join(values))
+    if len(found) == len(values):
+        hsl = np.array(found, dtype=np.float64).reshape(-1, 3)
+        return np.column_stack([hsl[:, 0] % 360, hsl[:, 1:] / 100])
+    return np.array([parse_color(value)[:3] for value in values], dtype=np.float64).reshape(-1, 3)
+
+
+def to_oklab(values: list) -> np.ndarray:
+    """(N, 3) OKLab (L, a, b) of color strings; identical strings are converted once."""
+    unique = {}
+    ids = np.fromiter((unique.setdefault(value, len(unique)) for value in values), dtype=np.int64, count=len(values))
+    return rgb_to_oklab(hsl_to_rgb(parse_hsl(list(unique))))[ids]
+
+
+def accent_color(palette: dict, defaults: dict, mode: str) -> str:
+    parts = [palette[mode].get(f'accent-{part}-{mode}') or defaults[mode][f'accent-{part}-{mode}'] for part in 'hsl']
+    return f'hsl({parts[0]}, {parts[1]}, {parts[2]})'
+
+
+class PaletteIndex:
+    """
+    Palettes indexed by OKLab vectors. `keys` lists, per mode, the
+    primitives that make up a palette's vector; keys a palette leaves
+    unset take their value from `defaults`, as they would when the
+    palette is generated.
+    """
+
+    def __init__(self, palettes: dict, defaults: dict, keys: dict):
+        self.slugs = list(palettes)
+        self.names = [palette['name'] for palette in palettes.values()]
+        self.colors = sum(len(mode_keys) for mode_keys in keys.values())
+        values = [
+            palette[mode].get(key) or defaults[mode][key]
+            for palette in palettes.values()
+            for mode, mode_keys in keys.items()
+            for key in mode_keys
+        ]
+        self.vectors = to_oklab(values).reshape(len(self.slugs), -1)
+        self.palettes = KDTree(self.vectors)
+
+        self.accent_modes = list(keys)
+        accents = [accent_color(palette, defaults, mode) for palette in palettes.values() for mode in self.accent_modes]
+        self.accents = KDTree(to_oklab(accents))
+
+    def _distance(self, full: float) -> float:
+        """A whole-vector distance as RMS ΔE per primitive."""
+        return full / np.sqrt(self.colors)
+
+    def nearest_color(self, color: str, k: int = 5) -> list:
+        """[(ΔE, slug, mode)] of the k palettes whose accent is closest to `color`."""
+        target = to_oklab([color])[0]
+        distances, rows = self.accents.query(target, k * len(self.accent_modes))
+        found = []
+        seen = set()
+        for distance, row in zip(distances, rows):
+            i, mode = divmod(int(row), len(self.accent_modes))
+            if i not in seen:
+                seen.add(i)
+                found.append((float(distance), self.slugs[i], self.accent_modes[mode]))
+        return found[:k]
+
+    def nearest_palette(self, slug: str, k: int = 5) -> list:
+        """[(RMS ΔE, slug)] of the k palettes closest to an indexed palette, itself excluded."""
+        i = self.slugs.index(slug)
+        distances, rows = self.palettes.query(self.vectors[i], k + 1)
+        return [(float(self._distance(d)), self.slugs[j]) for d, j in zip(distances, rows) if j != i][:k]
+
+    def duplicates(self, threshold: float = 0.02) -> list:
+        """[(RMS ΔE, slug, slug)] of every pair of palettes closer than `threshold`, closest first."""
+        distances, first, second = self.palettes.pairs(threshold * np.sqrt(self.colors))
+        order = np.argsort(distances, kind='stable')
+        return [
+            (float(self._distance(distances[n])), self.slugs[first[n]], self.slugs[second[n]])
+            for n in order.tolist()
+        ]
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Profile how expensive the compiled theme's selectors are to match.
+
+Scores every rule in src/css/main.css by the work a right-to-left
+selector engine like Blink's does for it: a key selector that
+matches every element (`*`, a bare pseudo-class) is tried against
+the whole DOM; descendant and general-sibling combinators walk all
+ancestors or siblings; substring attribute matchers compare strings;
+and `:has()` has to be re-checked whenever anything below the
+element changes, which is what makes typing lag in long notes.
+
+Rules are attributed to their Sass partial through main.css.map,
+then ranked per rule and per partial. Budgets turn the report into
+a check that fails when a change makes the theme more expensive.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from css_rules import iter_rules, split_complex, split_top_level
+from source_map import load_source_map
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+MAIN_CSS = os.path.join(ROOT, 'src', 'css', 'main.css')
+
+# ─────────────────────────────────────────────
+# COST MODEL
+# Relative, not milliseconds: 1 is one cheap compound
+# (`.class`) checked against a candidate element.
+# ─────────────────────────────────────────────
+
+WEIGHTS = {
+    'compound': 1,
+    ' ': 2,                 # descendant: may walk every ancestor
+    '>': 0.5,               # child: checks one parent
+    '+': 0.5,               # adjacent sibling: checks one sibling
+    '~': 2,                 # general sibling: may walk every sibling
+    'universal_key': 10,    # key matches every element: `*`, `:hover`, `[attr]`
+    'type_key': 3,          # key is a bare type selector such as `div`
+    'attribute': 1,
+    'attribute_substring': 3,   # *= ^= $= ~= |=
+    'pseudo_class': 0.5,
+    'has': 20,              # :has() is re-checked on every mutation below
+}
+
+SIMPLE = re.compile(
+    r'(?P<id>#[\w-]+)|(?P<class>\.[\w-]+)|(?P<attribute>\[[^\]]*\])'
+    r'|(?P<element>::[\w-]+(?:\([^)]*\))?)|(?P<pseudo>:[\w-]+)|(?P<type>\*|[\w-]+|&)'
+)
+SUBSTRING_MATCH = re.compile(r'[*^$~|]=')
+
+
+def pseudo_argument(compound: str, start: int) -> tuple:
+    """The argument of a functional pseudo-class starting at `start` ('('), and the offset after it."""
+    depth = 0
+    for i in range(start, len(compound)):
+        if compound[i] == '(':
+            depth += 1
+        elif compound[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return compound[start + 1:i], i + 1
+    return compound[start + 1:], len(compound)
+
+
+def compound_cost(compound: str, key: bool, flags: set) -> float:
+    cost = WEIGHTS['compound']
+    narrows = False
+    pos = 0
+    while pos < len(compound):
+        match = SIMPLE.match(compound, pos)
+        if not match:
+            pos += 1
+            continue
+        pos = match.end()
+        kind = match.lastgroup
+        if kind in ('id', 'class'):
+            narrows = True
+        elif kind == 'attribute':
+            if SUBSTRING_MATCH.search(match.group()):
+                cost += WEIGHTS['attribute_substring']
+                flags.add('attribute-substring')
+            else:
+                cost += WEIGHTS['attribute']
+                narrows = narrows or '=' in match.group()
+        elif kind == 'type' and match.group() == '*' and not key:
+            flags.add('universal')
+        elif kind == 'pseudo':
+            name = match.group()[1:]
+            cost += WEIGHTS['pseudo_class']
+            if pos < len(compound) and compound[pos] == '(':
+                argument, pos = pseudo_argument(compound, pos)
+                inner = sum(selector_cost(s, flags, relative=name == 'has') for s in split_top_level(argument))
+                if name == 'has':
+                    cost += WEIGHTS['has'] + inner
+                    flags.add('has')
+                elif name in ('is', 'where', 'not', 'matches', 'host', 'host-context'):
+                    cost += inner
+                    narrows = narrows or name in ('is', 'where', 'matches')
+
+    if key and not narrows:
+        if re.match(r'[\w-]', compound) and not compound.startswith('*'):
+            cost += WEIGHTS['type_key']
+            flags.add('type-key')
+        else:
+            cost += WEIGHTS['universal_key']
+            flags.add('universal-key')
+    return cost
+
+
+def selector_cost(selector: str, flags: set = None, relative: bool = False) -> float:
+    """Cost of one complex selector; `flags` collects what made it expensive."""
+    flags = set() if flags is None else flags
+    parts = split_complex(selector)
+    cost = 0
+    for i, (combinator, compound) in enumerate(parts):
+        cost += compound_cost(compound, key=i == len(parts) - 1 and not relative, flags=flags)
+        if combinator:
+            cost += WEIGHTS[combinator]
+    depth = sum(1 for combinator, _ in parts if combinator == ' ')
+    if depth >= 3:
+        flags.add('deep-descendant')
+    return cost
+
+
+# ─────────────────────────────────────────────
+# PROFILING
+# ─────────────────────────────────────────────
+
+def profile(css: str, source_map=None) -> dict:
+    """Score every rule and attribute it to a source partial."""
+    line_starts = [0] + [m.end() for m in re.finditer('\n', css)]
+    rules = []
+    partials = {}
+    for rule in iter_rules(css):
+        flags = set()
+        cost = sum(selector_cost(selector, flags) for selector in rule.selectors)
+        source = None
+        if source_map is not None:
+            found = source_map.lookup(rule.line - 1, rule.start - line_starts[rule.line - 1])
+            if found:
+                source = f'{os.path.relpath(found[0], ROOT)}:{found[1] + 1}'
+        partial = source.rsplit(':', 1)[0] if source else 'unmapped'
+        size = rule.end - rule.start
+        rules.append({
+            'line': rule.line,
+            'source': source,
+            'selectors': rule.selectors,
+            'cost': round(cost, 1),
+            'bytes': size,
+            'flags': sorted(flags),
+        })
+        entry = partials.setdefault(partial, {'rules': 0, 'selectors': 0, 'cost': 0, 'bytes': 0, 'has': 0})
+        entry['rules'] += 1
+        entry['selectors'] += len(rule.selectors)
+        entry['cost'] = round(entry['cost'] + cost, 1)
+        entry['bytes'] += size
+        entry['has'] += 'has' in flags
+    rules.sort(key=lambda rule: -rule['cost'])
+    return {
+        'rules': rules,
+        'partials': dict(sorted(partials.items(), key=lambda item: -item[1]['cost'])),
+        'total': {
+            'rules': len(rules),
+            'cost': round(sum(rule['cost'] for rule in rules), 1),
+            'bytes': sum(rule['bytes'] for rule in rules),
+        },
+    }
+
+
+def check_budgets(report: dict, args) -> list:
+    over = []
+    if args.max_rule_cost is not None:
+        for rule in report['rules']:
+            if rule['cost'] > args.max_rule_cost:
+                over.append(f"rule at {rule['source'] or 'main.css:' + str(rule['line'])} costs "
+                            f"{rule['cost']} (budget {args.max_rule_cost})")
+    for partial, entry in report['partials'].items():
+        if args.max_partial_cost is not None and entry['cost'] > args.max_partial_cost:
+            over.append(f"{partial} costs {entry['cost']} (budget {args.max_partial_cost})")
+        if args.max_partial_kb is not None and entry['bytes'] / 1024 > args.max_partial_kb:
+            over.append(f"{partial} compiles to {entry['bytes'] / 1024:.1f} KB (budget {args.max_partial_kb} KB)")
+    if args.max_has is not None:
+        count = sum(entry['has'] for entry in report['partials'].values())
+        if count > args.max_has:
+            over.append(f"{count} rules use :has() (budget {args.max_has})")
+    if args.max_total_cost is not None and report['total']['cost'] > args.max_total_cost:
+        over.append(f"the theme costs {report['total']['cost']} in total (budget {args.max_total_cost})")
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile selector matching cost of the compiled theme.')
+    parser.add_argument('css', nargs='?', default=MAIN_CSS,
+                        help='compiled stylesheet to profile (default: src/css/main.css and its .map)')
+    parser.add_argument('--top', type=int, default=15,
+                        help='how many of the most expensive rules and partials to list (default: 15)')
+    parser.add_argument('--max-rule-cost', type=float, help='fail if any rule costs more than this')
+    parser.add_argument('--max-partial-cost', type=float, help='fail if any partial costs more than this in total')
+    parser.add_argument('--max-partial-kb', type=float, help='fail if any partial compiles to more KB than this')
+    parser.add_argument('--max-has', type=int, help='fail if more rules than this use :has()')
+    parser.add_argument('--max-total-cost', type=float, help='fail if the whole theme costs more than this')
+    parser.add_argument('--report', metavar='PATH',
+                        help="write the full report as JSON to PATH ('-' for stdout)")
+    args = parser.parse_args()
+
+    with open(args.css, 'r', encoding='utf-8') as f:
+        css = f.read()
+    map_path = f'{args.css}.map'
+    source_map = load_source_map(map_path) if os.path.exists(map_path) else None
+    report = profile(css, source_map)
+    over = check_budgets(report, args)
+    report['over_budget'] = over
+
+    if args.report == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        sys.exit(1 if over else 0)
+
+    print("⏱️  Primary Theme Selector Profile")
+    print("=" * 40)
+    total = report['total']
+    print(f"\n   {total['rules']} rules, cost {total['cost']}, {total['bytes'] / 1024:.0f} KB")
+    if source_map is None:
+        print(f"   ⚠️  {os.path.basename(map_path)} not found, rules are not attributed to partials")
+
+    print("\n🔥 Most expensive rules")
+    for rule in report['rules'][:args.top]:
+        where = rule['source'] or f"main.css:{rule['line']}"
+        selector = rule['selectors'][0] + (f" (+{len(rule['selectors']) - 1})" if len(rule['selectors']) > 1 else '')
+        print(f"   {rule['cost']:6.1f}  {where}  {selector}")
+        if rule['flags']:
+            print(f"           {', '.join(rule['flags'])}")
+
+    print("\n📦 Most expensive partials")
+    for partial, entry in list(report['partials'].items())[:args.top]:
+        has = f", {entry['has']} :has()" if entry['has'] else ''
+        print(f"   {entry['cost']:8.1f}  {partial}: {entry['rules']} rules, {entry['bytes'] / 1024:.1f} KB{has}")
+
+    if over:
+        print(f"\n❌ {len(over)} budget(s) exceeded")
+        for line in over:
+            print(f"   {line}")
+    elif any(getattr(args, name) is not None for name in
+             ('max_rule_cost', 'max_partial_cost', 'max_partial_kb', 'max_has', 'max_total_cost')):
+        print("\n✅ Within budget")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+        print(f"\n📄 Report written to {args.report}")
+
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Serve theme.css rendered with any palette, on demand.
+
+A local HTTP service for handing per-user palettes to vaults without
+running Sass per request: each response is the compiled theme.css
+with the palette's primitives appended (see palette_api.py), kept in
+a bounded LRU cache and ETagged by the palette hash, so clients can
+revalidate with If-None-Match and get 304s.
+
+    GET  /palettes                      slugs and names in scripts/palettes/
+    GET  /palettes/<slug>/theme.css     theme with a library palette
+    GET  /palettes/<slug>/snippet.css   only that palette's primitives
+    POST /theme.css                     theme with the palette in the JSON body
+    POST /snippet.css                   only the primitives of the posted palette
+
+Palette files are re-read when they change; theme.css when it is
+rebuilt. Posted palettes that fail validation get a 422, broken files
+in scripts/palettes/ a 500. Binds to localhost unless --host says
+otherwise.
+"""
+
+import argparse
+import json
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from palette_api import THEME_CSS, PaletteError, ThemeRenderer, gen
+
+MAX_BODY = 64 * 1024
+KINDS = {'theme.css': 'theme', 'snippet.css': 'snippet'}
+
+
+class ThemeHandler(BaseHTTPRequestHandler):
+    renderer = None
+    server_version = 'PrimaryThemes/1'
+
+    def do_GET(self):
+        parts = self.path.split('?', 1)[0].strip('/').split('/')
+        if parts == ['palettes']:
+            try:
+                files = gen.palette_files()
+                names = {slug: gen.load_palette(path)['name'] for slug, path in files.items()}
+            except PaletteError as e:
+                self.send_library_error(e)
+                return
+            self.send_json(names)
+            return
+        if len(parts) == 3 and parts[0] == 'palettes' and parts[2] in KINDS:
+            try:
+                path = gen.palette_files().get(parts[1])
+                palette = gen.load_palette(path) if path else None
+            except PaletteError as e:
+                self.send_library_error(e)
+                return
+            if palette is None:
+                self.send_error(HTTPStatus.NOT_FOUND, explain=f'unknown palette {parts[1]!r}')
+                return
+            self.send_palette(palette, KINDS[parts[2]])
+            return
+        self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_POST(self):
+        kind = KINDS.get(self.path.split('?', 1)[0].strip('/'))
+        if kind is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        length = self.headers.get('Content-Length')
+        if length is None:
+            self.send_error(HTTPStatus.LENGTH_REQUIRED)
+            return
+        length = length.strip()
+        if not (length.isascii() and length.isdigit()):
+            self.send_error(HTTPStatus.BAD_REQUEST, explain='Content-Length must be a non-negative integer')
+            return
+        length = int(length)
+        if length > MAX_BODY:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return
+        try:
+            palette = json.loads(self.rfile.read(length))
+        except (ValueError, UnicodeDecodeError) as e:
+            self.send_error(HTTPStatus.BAD_REQUEST, explain=f'invalid JSON: {e}')
+            return
+        self.send_palette(palette, kind)
+
+    def send_palette(self, palette, kind: str):
+        start = time.perf_counter()
+        try:
+            etag, css = self.renderer.render(palette, kind)
+        except PaletteError as e:
+            self.send_error(HTTPStatus.UNPROCESSABLE_ENTITY, explain=str(e).replace('\n', '; '))
+            return
+        except FileNotFoundError as e:
+            self.send_error(HTTPStatus.SERVICE_UNAVAILABLE, explain=str(e))
+            return
+        etag = f'"{etag}"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache',
+                   'Server-Timing': f'render;dur={(time.perf_counter() - start) * 1000:.2f}'}
+        if etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+            self.send_body(HTTPStatus.NOT_MODIFIED, None, headers)
+        else:
+            self.send_body(HTTPStatus.OK, css.encode('utf-8'), {'Content-Type': 'text/css; charset=utf-8', **headers})
+
+    def send_library_error(self, error: PaletteError):
+        """A palette file in scripts/palettes/ is broken: the server's fault, not the client's."""
+        print(f"❌ {error}")
+        self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, explain=str(error).replace('\n', '; '))
+
+    def send_json(self, data):
+        self.send_body(HTTPStatus.OK, json.dumps(data, indent=2).encode('utf-8'), {'Content-Type': 'application/json'})
+
+    def send_body(self, status, body, headers: dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if body is not None:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body is not None:
+            self.wfile.write(body)
+
+    def log_error(self, format, *args):
+        pass    # the status line logged for every request already shows it
+
+    def log_message(self, format, *args):
+        renderer = self.renderer
+        print(f"   {self.command} {self.path} → {args[1] if len(args) > 1 else '-'} "
+              f"(cache {len(renderer.cache)}/{renderer.cache_size}, {renderer.hits} hit(s), {renderer.misses} miss(es))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve theme.css rendered with any palette, on demand.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8642, help='port to listen on (default: 8642)')
+    parser.add_argument('--cache-size', type=int, default=64,
+                        help='rendered themes to keep in memory, least recently used first out (default: 64)')
+    parser.add_argument('--theme', default=THEME_CSS, metavar='PATH',
+                        help='compiled base theme (default: theme.css at the repository root)')
+    args = parser.parse_args()
+
+    renderer = ThemeRenderer(args.theme, args.cache_size)
+    try:
+        css, _ = renderer.base()
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    ThemeHandler.renderer = renderer
+    server = ThreadingHTTPServer((args.host, args.port), ThemeHandler)
+
+    print("🌐 Primary Theme Server")
+    print("=" * 40)
+    print(f"\n   Base theme: {len(css) / 1024:.0f} KB, cache: {args.cache_size} render(s)")
+    print(f"   http://{args.host}:{args.port}/palettes/<slug>/theme.css")
+    print(f"   POST a palette as JSON to http://{args.host}:{args.port}/theme.css")
+    print("\n👀 Serving (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped serving.")
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
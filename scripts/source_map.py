@@ -0,0 +1,90 @@
+"""
+Source map v3 reader: maps positions in a compiled stylesheet back
+to the Sass partial they came from. Handles plain maps as written by
+Sass and the sectioned index maps the Gruntfile's `layers` task
+splices together.
+"""
+
+import json
+import os
+from bisect import bisect_right
+
+BASE64 = {char: i for i, char in enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')}
+
+
+def decode_vlq(segment: str) -> list:
+    """Decode one base64 VLQ segment into its integers."""
+    values = []
+    value = shift = 0
+    for char in segment:
+        digit = BASE64[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    return values
+
+
+class SourceMap:
+    """
+    Decoded mappings of a source map. `lines[n]` holds the mapped
+    columns of generated line n (0-based) as sorted
+    (column, source index, original line, original column) tuples.
+    """
+
+    def __init__(self, data: dict, base: str = ''):
+        self.sections = []
+        self.sources = []
+        self.lines = []
+        if 'sections' in data:
+            for section in data['sections']:
+                offset = section['offset']
+                self.sections.append(((offset['line'], offset['column']), SourceMap(section['map'], base)))
+            return
+
+        root = data.get('sourceRoot') or ''
+        self.sources = [os.path.normpath(os.path.join(base, root, source)) for source in data.get('sources', [])]
+        source = line = column = 0
+        for segments in data.get('mappings', '').split(';'):
+            decoded = []
+            generated = 0
+            for segment in segments.split(','):
+                if not segment:
+                    continue
+                fields = decode_vlq(segment)
+                generated += fields[0]
+                if len(fields) >= 4:
+                    source += fields[1]
+                    line += fields[2]
+                    column += fields[3]
+                    decoded.append((generated, source, line, column))
+            self.lines.append(decoded)
+        self._columns = [[segment[0] for segment in line] for line in self.lines]
+
+    def lookup(self, line: int, column: int):
+        """
+        (source path, original line, original column) for a 0-based
+        generated position, or None when nothing maps there.
+        """
+        if self.sections:
+            i = bisect_right([offset for offset, _ in self.sections], (line, column)) - 1
+            if i < 0:
+                return None
+            (offset_line, offset_column), section = self.sections[i]
+            if line == offset_line:
+                column -= offset_column
+            return section.lookup(line - offset_line, column)
+
+        if line >= len(self.lines) or not self.lines[line]:
+            return None
+        i = bisect_right(self._columns[line], column) - 1
+        _, source, original_line, original_column = self.lines[line][max(i, 0)]
+        return self.sources[source], original_line, original_column
+
+
+def load_source_map(path: str) -> SourceMap:
+    """Read a .map file; source paths are resolved relative to it."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return SourceMap(json.load(f), os.path.dirname(path))
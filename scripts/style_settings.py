@@ -0,0 +1,164 @@
+"""
+Parsed index of the Style Settings schema in src/css/style-settings.css.
+
+The schema is YAML inside a `/* @settings */` comment, but only a flat
+subset of it: a list of settings whose fields are scalars, plus
+`options` lists of scalars or label/value pairs. This reads exactly
+that subset, with the line number of every setting, instead of
+depending on a YAML library.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+STYLE_SETTINGS = os.path.join(os.path.dirname(__file__), '..', 'src', 'css', 'style-settings.css')
+
+SETTINGS_BLOCK = re.compile(r'/\*\s*@settings\b(.*?)\*/', re.S)
+FIELD = re.compile(r'([\w-]+):\s*(.*)')
+
+# Style Settings derives extra variables from these color formats
+SPLIT_FORMATS = {
+    'hsl-split': ('-h', '-s', '-l', '-a'),
+    'hsl-split-decimal': ('-h', '-s', '-l', '-a'),
+    'rgb-split': ('-r', '-g', '-b', '-a'),
+}
+
+Setting = namedtuple('Setting', 'id type line fields')
+
+
+class SettingsError(Exception):
+    pass
+
+
+def parse_scalar(text: str):
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in '\'"':
+        return text[1:-1]
+    if text in ('true', 'false'):
+        return text == 'true'
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_settings(text: str) -> list:
+    """Parse every `@settings` block of a stylesheet into Setting tuples."""
+    settings = []
+    for block in SETTINGS_BLOCK.finditer(text):
+        first_line = text.count('\n', 0, block.start(1)) + 1
+        item_indent = None
+        fields = line = None
+        option = option_indent = None
+
+        for number, raw in enumerate(block.group(1).split('\n'), first_line):
+            expanded = raw.expandtabs(4)
+            stripped = expanded.strip()
+            if not stripped or stripped.startswith('#'):
+                continue
+            indent = len(expanded) - len(expanded.lstrip())
+
+            if stripped == '-' or stripped.startswith('- '):
+                rest = stripped[1:].strip()
+                if item_indent is None or indent <= item_indent:
+                    if item_indent is None and 'settings' not in (fields or {}):
+                        raise SettingsError(f'line {number}: list item outside `settings:`')
+                    if line is not None:
+                        settings.append(Setting(fields.get('id'), fields.get('type'), line, fields))
+                    item_indent = indent
+                    fields, line = {}, number
+                    option = option_indent = None
+                    if rest:
+                        key, value = FIELD.fullmatch(rest).groups()
+                        fields[key] = parse_scalar(value)
+                    continue
+                if 'options' not in fields:
+                    raise SettingsError(f'line {number}: nested list outside `options:`')
+                option_indent = indent
+                field = FIELD.fullmatch(rest)
+                if not rest or (field and not rest.startswith(('"', "'"))):
+                    option = {field.group(1): parse_scalar(field.group(2))} if rest else {}
+                    fields['options'].append(option)
+                else:
+                    option = None
+                    fields['options'].append(parse_scalar(rest))
+                continue
+
+            field = FIELD.fullmatch(stripped)
+            if not field:
+                raise SettingsError(f'line {number}: expected `key: value`, got {stripped!r}')
+            key, value = field.groups()
+            if item_indent is None:
+                fields = fields or {}
+                fields[key] = parse_scalar(value)
+            elif option is not None and indent > option_indent:
+                option[key] = parse_scalar(value)
+            else:
+                option = None
+                fields[key] = [] if key == 'options' and not value.strip() else parse_scalar(value)
+
+        if line is not None:
+            settings.append(Setting(fields.get('id'), fields.get('type'), line, fields))
+    return settings
+
+
+def option_value(option):
+    """The class or value an option selects."""
+    return option.get('value') if isinstance(option, dict) else option
+
+
+def setting_classes(setting: Setting) -> list:
+    """Body classes a setting can add: its id for toggles, option values for selects."""
+    if setting.type == 'class-toggle':
+        return [setting.id]
+    if setting.type == 'class-select':
+        return [option_value(option) for option in setting.fields.get('options', [])]
+    return []
+
+
+def setting_variables(setting: Setting) -> list:
+    """Custom properties (without `--`) a variable-* setting sets."""
+    if not (setting.type or '').startswith('variable-'):
+        return []
+    suffixes = SPLIT_FORMATS.get(setting.fields.get('format'))
+    if suffixes:
+        return [setting.id + suffix for suffix in suffixes]
+    return [setting.id]
+
+
+class SettingsSchema:
+    """
+    Style Settings entries indexed by id, by type, by the body classes
+    they toggle and by the custom properties they set.
+    """
+
+    def __init__(self, settings: list):
+        self.settings = settings
+        self.by_id = {}
+        self.by_type = {}
+        self.classes = {}
+        self.variables = {}
+        for setting in settings:
+            self.by_id.setdefault(setting.id, []).append(setting)
+            self.by_type.setdefault(setting.type, []).append(setting)
+            for name in setting_classes(setting):
+                self.classes.setdefault(name, []).append(setting)
+            for name in setting_variables(setting):
+                self.variables.setdefault(name, []).append(setting)
+
+    def duplicates(self) -> dict:
+        """Ids used by more than one setting that stores a value."""
+        return {
+            setting_id: settings for setting_id, settings in self.by_id.items()
+            if len(settings) > 1 and any(s.type not in ('heading', 'info-text') for s in settings)
+        }
+
+
+def load_schema(path: str = STYLE_SETTINGS) -> SettingsSchema:
+    with open(path, 'r', encoding='utf-8') as f:
+        return SettingsSchema(parse_settings(f.read()))
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Subset the fonts embedded in src/css/fonts/*.css.
+
+Inter and Cascadia Code are inlined into theme.css as base64 WOFF2,
+which is most of the theme's size. This keeps only the glyphs for the
+selected scripts and the OpenType features the typography settings
+turn on, then writes src/css/fonts/subset/<name>.css. The weight axis
+is kept whole unless --weights narrows it: the --font-thin ..
+--font-black variables and the heading weights are Style Settings
+that users move freely, and a trimmed axis silently clamps them.
+Grunt only bundles the subset when run with --subset-fonts
+(npx grunt lean --subset-fonts); the default build, and so the
+released theme.css, keeps the full fonts.
+
+Requires fontTools and brotli (pip install fonttools brotli).
+"""
+
+import argparse
+import base64
+import io
+import os
+import re
+import sys
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    from fontTools.varLib import instancer
+except ModuleNotFoundError:
+    subset = None
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+FONTS_DIR = os.path.join(ROOT, 'src', 'css', 'fonts')
+SUBSET_DIR = os.path.join(FONTS_DIR, 'subset')
+TEMPLATE = os.path.join(ROOT, 'src', 'scss', '10_foundations', 'palettes', '_classic-original.scss')
+
+# ─────────────────────────────────────────────
+# UNICODE RANGES
+# ─────────────────────────────────────────────
+
+SCRIPTS = {
+    'latin': [
+        (0x0000, 0x00FF),   # Basic Latin, Latin-1 Supplement
+        (0x0131, 0x0131), (0x0152, 0x0153), (0x02BB, 0x02BC), (0x02C6, 0x02C6), (0x02DA, 0x02DA), (0x02DC, 0x02DC),
+        (0x0300, 0x036F),   # Combining Diacritical Marks
+        (0x2000, 0x206F),   # General Punctuation
+        (0x2070, 0x209F),   # Superscripts and Subscripts
+        (0x20A0, 0x20CF),   # Currency Symbols
+        (0x2100, 0x214F),   # Letterlike Symbols
+        (0x2190, 0x21FF),   # Arrows
+        (0x2200, 0x22FF),   # Mathematical Operators
+        (0x2300, 0x23FF),   # Miscellaneous Technical
+        (0x2500, 0x257F),   # Box Drawing (used by the theme's own comments)
+        (0x25A0, 0x25FF),   # Geometric Shapes
+        (0x2713, 0x2717),   # Check marks
+        (0xFEFF, 0xFEFF), (0xFFFD, 0xFFFD),
+    ],
+    'latin-ext': [
+        (0x0100, 0x024F),   # Latin Extended-A, -B
+        (0x0259, 0x0259),
+        (0x1E00, 0x1EFF),   # Latin Extended Additional
+        (0x2C60, 0x2C7F), (0xA720, 0xA7FF),
+    ],
+    'vietnamese': [(0x0102, 0x0103), (0x0110, 0x0111), (0x0128, 0x0129), (0x0168, 0x0169),
+                   (0x01A0, 0x01A1), (0x01AF, 0x01B0), (0x1EA0, 0x1EF9)],
+    'greek': [(0x0370, 0x03FF), (0x1F00, 0x1FFF)],
+    'cyrillic': [(0x0400, 0x052F), (0x1C80, 0x1C88), (0x2DE0, 0x2DFF), (0xA640, 0xA69F)],
+}
+
+# ─────────────────────────────────────────────
+# WHAT THE THEME REFERENCES
+# ─────────────────────────────────────────────
+
+FEATURE_VARIABLE = re.compile(r'--(?:interface|text|monospace)-font-feature:\s*([^;]+);')
+FEATURE_TAG = re.compile(r'"(\w{4})"')
+WEIGHT_VARIABLE = re.compile(
+    r'--font-(?:thin|extralight|light|normal|medium|semibold|bold|extrabold|black):\s*(\d+)\s*;'
+)
+FONT_FACE = re.compile(r'@font-face\s*\{.*?\}', re.S)
+FONT_DATA = re.compile(r'(url\(data:[^;,]+;base64,)([A-Za-z0-9+/=]+)(\))')
+FONT_WEIGHT = re.compile(r'font-weight:\s*\d+\s+\d+;')
+
+
+def referenced_features(template: str) -> list:
+    """OpenType feature tags set by the --*-font-feature variables."""
+    tags = set()
+    for value in FEATURE_VARIABLE.findall(template):
+        tags.update(FEATURE_TAG.findall(value))
+    return sorted(tags)
+
+
+def parse_weights(text: str) -> tuple:
+    """`LO-HI` as a (lo, hi) pair of weights."""
+    try:
+        lo, hi = (int(part) for part in text.split('-'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'expected LO-HI, such as 100-900, got {text!r}')
+    if not 1 <= lo < hi <= 1000:
+        raise argparse.ArgumentTypeError(f'{text}: weights must satisfy 1 <= LO < HI <= 1000')
+    return lo, hi
+
+
+def referenced_weights(template: str):
+    """(lightest, heaviest) of the --font-<weight> variables, or None."""
+    weights = [int(w) for w in WEIGHT_VARIABLE.findall(template)]
+    return (min(weights), max(weights)) if weights else None
+
+
+def unicodes_for(scripts: list) -> list:
+    codepoints = set()
+    for script in scripts:
+        for start, end in SCRIPTS[script]:
+            codepoints.update(range(start, end + 1))
+    return sorted(codepoints)
+
+
+# ─────────────────────────────────────────────
+# SUBSETTING
+# ─────────────────────────────────────────────
+
+def subset_font(data: bytes, unicodes: list, features: list, weights) -> tuple:
+    """
+    Subset one WOFF2 font. Returns (woff2 bytes, (min, max) wght range
+    or None for fonts without a weight axis).
+    """
+    font = TTFont(io.BytesIO(data))
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.layout_features = sorted(set(options.layout_features) | set(features))
+    options.notdef_outline = True
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=unicodes)
+    subsetter.subset(font)
+
+    wght = None
+    if 'fvar' in font:
+        axis = next((a for a in font['fvar'].axes if a.axisTag == 'wght'), None)
+        if axis is not None:
+            wght = (axis.minValue, axis.maxValue)
+            if weights:
+                lo = max(axis.minValue, weights[0])
+                hi = min(axis.maxValue, weights[1])
+                if (lo, hi) != wght and lo < hi:
+                    font = instancer.instantiateVariableFont(font, {'wght': (lo, hi)})
+                    wght = (lo, hi)
+
+    out = io.BytesIO()
+    font.flavor = 'woff2'
+    font.save(out)
+    return out.getvalue(), wght
+
+
+def subset_css(css: str, unicodes: list, features: list, weights) -> str:
+    """Rewrite every embedded font in a fonts/*.css file with its subset."""
+    def face(match):
+        block = match.group()
+        data = FONT_DATA.search(block)
+        if not data:
+            return block
+        font, wght = subset_font(base64.b64decode(data.group(2)), unicodes, features, weights)
+        block = block[:data.start(2)] + base64.b64encode(font).decode('ascii') + block[data.end(2):]
+        if wght:
+            block = FONT_WEIGHT.sub(f'font-weight: {wght[0]:g} {wght[1]:g};', block)
+        return block
+
+    return FONT_FACE.sub(face, css)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Subset the fonts embedded in src/css/fonts/*.css.')
+    parser.add_argument('--scripts', default='latin,latin-ext',
+                        help=f"comma-separated glyph sets to keep, from: {', '.join(SCRIPTS)} (default: latin,latin-ext)")
+    parser.add_argument('--features', default='',
+                        help='extra OpenType feature tags to keep, comma-separated')
+    parser.add_argument('--weights', type=parse_weights, metavar='LO-HI',
+                        help="trim each font's weight axis to this range (default: keep the full axis, "
+                             "since Style Settings can set any weight)")
+    args = parser.parse_args()
+
+    if subset is None:
+        print("❌ fontTools is not installed: pip install fonttools brotli", file=sys.stderr)
+        sys.exit(1)
+
+    scripts = [s.strip() for s in args.scripts.split(',') if s.strip()]
+    unknown = [s for s in scripts if s not in SCRIPTS]
+    if unknown:
+        parser.error(f"unknown script(s): {', '.join(unknown)}")
+
+    with open(TEMPLATE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    features = referenced_features(template) + [t.strip() for t in args.features.split(',') if t.strip()]
+    weights = args.weights
+    defaults = referenced_weights(template)
+    unicodes = unicodes_for(scripts)
+
+    print("🔠 Primary Theme Font Subsetter")
+    print("=" * 40)
+    print(f"\n   Scripts:  {', '.join(scripts)} ({len(unicodes)} code points)")
+    print(f"   Features: {', '.join(features)} + fontTools defaults")
+    print(f"   Weights:  {'full axis' if weights is None else f'{weights[0]}–{weights[1]}'}")
+    if weights and defaults and (weights[0] > defaults[0] or weights[1] < defaults[1]):
+        print(f"   ⚠️  the theme's default weights span {defaults[0]}–{defaults[1]}; weights outside "
+              f"{weights[0]}–{weights[1]} will render clamped")
+
+    os.makedirs(SUBSET_DIR, exist_ok=True)
+    for filename in sorted(os.listdir(FONTS_DIR)):
+        if not filename.endswith('.css'):
+            continue
+        with open(os.path.join(FONTS_DIR, filename), 'r', encoding='utf-8') as f:
+            css = f.read()
+        result = subset_css(css, unicodes, features, weights)
+        with open(os.path.join(SUBSET_DIR, filename), 'w', encoding='utf-8') as f:
+            f.write(result)
+        print(f"\n✂️  {filename}: {len(css) / 1024:.0f} KB → {len(result) / 1024:.0f} KB")
+
+    print(f"\n🎉 Done! Subset fonts written to {SUBSET_DIR}")
+    print("Bundle them with: npx grunt lean --subset-fonts (or npx grunt --subset-fonts)")
+    print("Builds without --subset-fonts keep the full fonts.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Contrast scores from scripts/palette_audit.py.
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from palette_api import gen  # noqa: E402
+from palette_audit import audit_palettes  # noqa: E402
+
+
+class AuditPalettesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(gen.ORIGINAL, 'r', encoding='utf-8') as f:
+            cls.template = gen.PaletteTemplate(f.read())
+        cls.palettes = gen.load_palettes()
+
+    def score(self, slug: str, palette: dict, fg: str, bg: str, mode: str) -> dict:
+        report = audit_palettes(self.template, {slug: palette}, pairs=[(fg, bg, 'text')])
+        return next(r for r in report['palettes'][slug]['results'] if r['mode'] == mode)
+
+    def test_translucent_background_is_composited_over_the_page(self):
+        # hsla(42, 93%, 82%, 0.2) over the dark background-primary, not
+        # the opaque pale yellow it would be on its own (1.36:1)
+        result = self.score('blossom-neo', self.palettes['blossom-neo'],
+                            'normal-highlight-color', 'normal-highlight-bg', 'dark')
+        self.assertEqual(result['background_value'], 'hsla(42, 93%, 82%, 0.2)')
+        self.assertAlmostEqual(result['wcag'], 5.2, delta=0.1)
+        self.assertTrue(result['pass'])
+
+
+if __name__ == '__main__':
+    unittest.main()
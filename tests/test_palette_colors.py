@@ -0,0 +1,63 @@
+"""
+Derived ramps from scripts/palette_colors.py, against Classic Original.
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from palette_api import gen  # noqa: E402
+from palette_colors import hsl_to_rgb, parse_colors, rgb_to_oklab  # noqa: E402
+
+# OKLab ΔE; about 0.02 is a just-noticeable difference
+GRAY_TOLERANCE = 0.02
+SEMANTIC_TOLERANCE = 0.1
+
+
+def delta_e(a, b) -> np.ndarray:
+    return np.linalg.norm(rgb_to_oklab(hsl_to_rgb(a)) - rgb_to_oklab(hsl_to_rgb(b)), axis=-1)
+
+
+class DerivedRampsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(gen.ORIGINAL, 'r', encoding='utf-8') as f:
+            cls.defaults = gen.PaletteTemplate(f.read()).defaults()
+        no_seeds = {'light': {}, 'dark': {}}
+        cls.derived = gen.derive_palette(cls.defaults, gen.TEMPLATE_NAME, no_seeds)
+
+    def compare(self, mode: str, keys: list) -> np.ndarray:
+        expected = parse_colors(self.defaults[mode][key] for key in keys)
+        derived = parse_colors(self.derived[mode][key] for key in keys)
+        return delta_e(derived, expected)
+
+    def test_gray_ramp_from_classic_original_ends(self):
+        for mode in ('light', 'dark'):
+            with self.subTest(mode=mode):
+                keys = [f'color-{mode[0]}-gray-{step}' for step in gen.GRAY_STEPS]
+                self.assertLess(self.compare(mode, keys).max(), GRAY_TOLERANCE)
+
+    def test_semantic_ramps_from_classic_original_shade_20(self):
+        for mode in ('light', 'dark'):
+            for color in gen.SEMANTIC_COLORS:
+                with self.subTest(mode=mode, color=color):
+                    keys = [f'color-{mode[0]}-{color}-{shade}' for shade in gen.SEMANTIC_SHADES]
+                    self.assertLess(self.compare(mode, keys).max(), SEMANTIC_TOLERANCE)
+
+    def test_seeds_are_kept_and_validate(self):
+        seeds = gen.parse_seeds(['color-l-gray-10=hsla(200, 30%, 97%, 1)', 'color-d-blue-20=#4a9fd8'])
+        palette = gen.derive_palette(self.defaults, 'Seeded', seeds)
+        self.assertEqual(palette['light']['color-l-gray-10'], 'hsla(200, 30%, 97%, 1)')
+        self.assertEqual(gen.validate_palette(palette), [])
+        self.assertEqual(gen.parse_palette('seeded.toml', gen.render_palette_file(palette).encode()), palette)
+
+
+if __name__ == '__main__':
+    unittest.main()
